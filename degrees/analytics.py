@@ -0,0 +1,233 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from multiprocessing import shared_memory
+
+import degrees
+from graph import CSRGraph
+from landmarks import UNREACHABLE, bfs_distances
+
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_people"]
+
+# The star graph as seen by each worker process, attached by `attach`
+worker_graph = None
+
+
+def share(graph):
+    """
+    Copies the CSR arrays of `graph` into shared memory blocks, returning
+    the blocks and the (name, length) spec workers need to attach them.
+    """
+    blocks = []
+    spec = {"people": len(graph.person_ids), "movies": len(graph.movie_ids)}
+    for name in ARRAYS:
+        values = array("i", getattr(graph, name))
+        size = len(values) * values.itemsize
+        block = shared_memory.SharedMemory(
+            create=True, size=max(values.itemsize, size)
+        )
+        block.buf[:size] = values.tobytes()
+        blocks.append(block)
+        spec[name] = (block.name, len(values))
+    return blocks, spec
+
+
+def attach(spec):
+    """
+    Pool initializer making the shared CSR arrays described by `spec`
+    available to this worker as `worker_graph`, without copying them.
+    """
+    global worker_graph
+    blocks = []
+    fields = {}
+    for name in ARRAYS:
+        block_name, length = spec[name]
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        fields[name] = block.buf.cast("i")[:length]
+    worker_graph = CSRGraph(
+        range(spec["people"]), None, None, range(spec["movies"]), None, None,
+        **fields
+    )
+    # Keep the blocks open for as long as the worker lives
+    worker_graph.blocks = blocks
+
+
+def profile(s):
+    """
+    Returns (s, histogram) where histogram[d] is the number of people
+    exactly d degrees of separation from person index `s`.
+    """
+    distances = bfs_distances(worker_graph, s)
+    histogram = []
+    remaining = len(distances) - distances.count(UNREACHABLE)
+    d = 0
+    while remaining:
+        count = distances.count(d)
+        histogram.append(count)
+        remaining -= count
+        d += 1
+    return s, histogram
+
+
+def components(graph):
+    """
+    Returns an array labelling every person index with the index
+    of the connected component they belong to.
+    """
+    n = len(graph.person_ids)
+    labels = array("i", [-1]) * n
+    component = 0
+    for s in range(n):
+        if labels[s] != -1:
+            continue
+        labels[s] = component
+        frontier = deque([s])
+        while frontier:
+            p = frontier.popleft()
+            for m in graph.movies_of(p):
+                for q in graph.stars_of(m):
+                    if labels[q] == -1:
+                        labels[q] = component
+                        frontier.append(q)
+        component += 1
+    return labels
+
+
+def bacon_numbers(graph, person_id, filename=None):
+    """
+    Prints how many people are each number of degrees of separation from
+    `person_id`, and writes every person's number to CSV `filename`.
+    """
+    distances = bfs_distances(graph, graph.person_index[person_id])
+    print(f"Degrees of separation from {graph.name(person_id)}:")
+    d = 0
+    remaining = len(distances) - distances.count(UNREACHABLE)
+    while remaining:
+        count = distances.count(d)
+        print(f"  {d}: {count}")
+        remaining -= count
+        d += 1
+    print(f"  not connected: {distances.count(UNREACHABLE)}")
+
+    if filename is not None:
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["person_id", "name", "degrees"])
+            for p, distance in enumerate(distances):
+                writer.writerow([
+                    graph.person_ids[p],
+                    graph.names[p],
+                    "" if distance == UNREACHABLE else distance,
+                ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute degrees of separation statistics "
+                    "from many people in parallel."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--sources", type=int, default=100,
+                        help="number of random people to profile")
+    parser.add_argument("--all", action="store_true",
+                        help="profile every person who starred in a movie")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bacon", metavar="PERSON_ID",
+                        help="instead of profiling, tabulate everyone's "
+                             "degrees of separation from this person")
+    parser.add_argument("--output",
+                        help="CSV file to write each profiled person's "
+                             "distance distribution, or everyone's "
+                             "--bacon number, to")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = degrees.load_graph(args.directory)
+    print("Data loaded.")
+
+    if args.bacon:
+        if args.bacon not in graph.person_index:
+            sys.exit("Person not found.")
+        bacon_numbers(graph, args.bacon, args.output)
+        return
+
+    offsets = graph.person_offsets
+    actors = [p for p in range(len(graph.person_ids))
+              if offsets[p + 1] > offsets[p]]
+    if args.all or args.sources >= len(actors):
+        sources = actors
+    else:
+        sources = random.Random(args.seed).sample(actors, args.sources)
+
+    start = time.perf_counter()
+    labels = components(graph)
+    sizes = {}
+    for label in labels:
+        sizes[label] = sizes.get(label, 0) + 1
+    print(f"{len(sizes)} connected components "
+          f"({time.perf_counter() - start:.1f}s), largest:",
+          ", ".join(str(size) for size in
+                    sorted(sizes.values(), reverse=True)[:5]))
+
+    start = time.perf_counter()
+    blocks, spec = share(graph)
+    totals = []
+    eccentricity = 0
+    writer = None
+    output = open(args.output, "w", newline="") if args.output else None
+    try:
+        if output is not None:
+            writer = csv.writer(output)
+            writer.writerow(["person_id", "name", "reachable",
+                             "eccentricity", "mean", "histogram"])
+        with multiprocessing.Pool(args.workers, attach, (spec,)) as pool:
+            chunksize = max(1, len(sources) // (4 * args.workers))
+            for s, histogram in pool.imap_unordered(profile, sources,
+                                                    chunksize):
+                eccentricity = max(eccentricity, len(histogram) - 1)
+                for d, count in enumerate(histogram):
+                    if d == len(totals):
+                        totals.append(0)
+                    totals[d] += count
+                if writer is not None:
+                    reachable = sum(histogram) - 1
+                    mean = sum(d * count for d, count in enumerate(histogram))
+                    writer.writerow([
+                        graph.person_ids[s],
+                        graph.names[s],
+                        reachable,
+                        len(histogram) - 1,
+                        f"{mean / reachable:.3f}" if reachable else "",
+                        " ".join(str(count) for count in histogram),
+                    ])
+    finally:
+        if output is not None:
+            output.close()
+        for block in blocks:
+            block.close()
+            block.unlink()
+    elapsed = time.perf_counter() - start
+
+    print(f"Profiled {len(sources)} people with {args.workers} workers "
+          f"in {elapsed:.1f}s ({len(sources) / elapsed:.1f} per second).")
+    print(f"Diameter is at least {eccentricity}.")
+    pairs = sum(totals[1:])
+    if pairs:
+        mean = sum(d * count for d, count in enumerate(totals)) / pairs
+        print(f"Mean degrees of separation: {mean:.3f}")
+    print("Distance distribution:")
+    for d, count in enumerate(totals[1:], 1):
+        print(f"  {d}: {count} ({count / pairs:.2%})")
+
+
+if __name__ == "__main__":
+    main()
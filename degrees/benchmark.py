@@ -0,0 +1,128 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import degrees
+from landmarks import LandmarkIndex
+
+
+def sample_pairs(count, seed):
+    """
+    Returns `count` random (source, target) pairs of people
+    who starred in at least one movie.
+    """
+    rng = random.Random(seed)
+    candidates = sorted(
+        person_id for person_id, person in degrees.people.items()
+        if person["movies"]
+    )
+    return [(rng.choice(candidates), rng.choice(candidates))
+            for _ in range(count)]
+
+
+def run(search, pairs):
+    """
+    Runs `search` on every pair, returning the path lengths found,
+    the total number of people expanded and the elapsed wall time.
+    """
+    stats = {"expanded": 0}
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = search(source, target, stats=stats)
+        lengths.append(None if path is None else len(path))
+    elapsed = time.perf_counter() - start
+    return lengths, stats["expanded"], elapsed
+
+
+def time_neighbors(neighbors_for_person, pairs):
+    """
+    Returns the mean time in microseconds of one
+    `neighbors_for_person` call over every source in `pairs`.
+    """
+    start = time.perf_counter()
+    for source, _ in pairs:
+        neighbors_for_person(source)
+    return (time.perf_counter() - start) / len(pairs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the degrees search strategies "
+                    "and graph representations."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--pairs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-bfs", action="store_true",
+                        help="leave out the slow single-ended dict BFS")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="include A* search over the landmark index "
+                             "built by landmarks.py")
+    parser.add_argument("--memory", action="store_true",
+                        help="trace memory use of each representation "
+                             "(slows loading down considerably)")
+    args = parser.parse_args()
+
+    if args.memory:
+        tracemalloc.start()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    dict_bytes = tracemalloc.get_traced_memory()[0] if args.memory else None
+    graph = degrees.load_graph(args.directory, cache=False)
+    print("Data loaded.")
+
+    pairs = sample_pairs(args.pairs, args.seed)
+    searches = [
+        ("dict bfs", degrees.shortest_path),
+        ("dict bidirectional", degrees.shortest_path_bidirectional),
+        ("csr bfs", graph.shortest_path),
+        ("csr bidirectional", graph.shortest_path_bidirectional),
+    ]
+    if args.skip_bfs:
+        searches.pop(0)
+    if args.landmarks:
+        index = LandmarkIndex.load(args.directory)
+        if index is None:
+            raise RuntimeError("no current landmark index to benchmark")
+        searches.append((
+            "csr landmarks",
+            lambda source, target, stats: index.shortest_path(
+                graph, source, target, stats=stats
+            )
+        ))
+
+    baseline = None
+    print(f"{'search':<20}{'expanded':>12}{'seconds':>12}")
+    for name, search in searches:
+        lengths, expanded, elapsed = run(search, pairs)
+        if baseline is None:
+            baseline = lengths
+        elif lengths != baseline:
+            raise RuntimeError(f"{name} disagrees on path lengths")
+        print(f"{name:<20}{expanded:>12}{elapsed:>12.3f}")
+
+    print()
+    print(f"{'representation':<20}{'neighbors us':>14}{'memory MiB':>12}")
+    dict_us = time_neighbors(degrees.neighbors_for_person, pairs)
+    csr_us = time_neighbors(graph.neighbors_for_person, pairs)
+
+    csr_bytes = None
+    if args.memory:
+        # Drop the dicts so only the graph keeps the strings alive
+        degrees.people.clear()
+        degrees.movies.clear()
+        gc.collect()
+        csr_bytes = tracemalloc.get_traced_memory()[0]
+
+    for name, us, size in [("dict", dict_us, dict_bytes),
+                           ("csr", csr_us, csr_bytes)]:
+        mib = "-" if size is None else f"{size / 2 ** 20:.1f}"
+        print(f"{name:<20}{us:>14.1f}{mib:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import argparse
 import csv
 import sys
+from collections import deque
 
+import landmarks
+import snapshot
+from ingest import ingest
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -52,24 +57,77 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory, cache=True):
+    """
+    Load data from CSV files into a CSRGraph, keeping only the people
+    and movies that appear in stars.csv.
+
+    If `cache` is True, a binary snapshot of the graph is memory-mapped
+    from `directory` when it is still current, and written there after
+    parsing the CSV files when it is missing or stale.
+    """
+    if cache:
+        graph = snapshot.load(directory)
+        if graph is not None:
+            return graph
+
+    graph = ingest(directory)
+
+    if cache:
+        snapshot.save(directory, graph)
+    return graph
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search",
+                        choices=["bfs", "bidirectional", "landmarks"],
+                        default="bfs",
+                        help="search strategy used to find the path "
+                             "(landmarks implies --graph csr)")
+    parser.add_argument("--graph", choices=["dict", "csr"], default="dict",
+                        help="in-memory representation of the star graph")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor write the csr snapshot")
+    args = parser.parse_args()
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    graph = None
+    index = None
+    if args.graph == "csr" or args.search == "landmarks":
+        graph = load_graph(directory, cache=not args.no_cache)
+    else:
+        load_data(directory)
+    if args.search == "landmarks":
+        index = landmarks.LandmarkIndex.load(directory)
+        if index is None:
+            sys.exit("No current landmark index; "
+                     "run python landmarks.py build first.")
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), graph)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), graph)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if index is not None:
+        path = index.shortest_path(graph, source, target)
+    elif graph is not None:
+        if args.search == "bidirectional":
+            path = graph.shortest_path_bidirectional(source, target)
+        else:
+            path = graph.shortest_path(source, target)
+    elif args.search == "bidirectional":
+        path = shortest_path_bidirectional(source, target)
+    else:
+        path = shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,18 +136,26 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            if graph is not None:
+                person1 = graph.name(path[i][1])
+                person2 = graph.name(path[i + 1][1])
+                movie = graph.title(path[i + 1][0])
+            else:
+                person1 = people[path[i][1]]["name"]
+                person2 = people[path[i + 1][1]]["name"]
+                movie = movies[path[i + 1][0]]["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If `stats` is a dict, the number of people whose neighbors were
+    expanded is accumulated in `stats["expanded"]`.
     """
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
@@ -112,6 +178,8 @@ def shortest_path(source, target):
             actions.reverse()
             return actions
         else:
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
             neighbours = neighbors_for_person(node.state)
             for neighbour in neighbours:
                 movie_id, person_id = neighbour
@@ -120,20 +188,94 @@ def shortest_path(source, target):
                     frontier.add(new_node)
 
 
-def person_id_for_name(name):
+def shortest_path_bidirectional(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once and always expanding the smaller frontier.
+
+    If no possible path, returns None.
+
+    If `stats` is a dict, the number of people whose neighbors were
+    expanded is accumulated in `stats["expanded"]`.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a reached person to the (movie_id, person_id) step
+    # that links it back towards that side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = deque([source])
+    backward_frontier = deque([target])
+
+    while forward_frontier and backward_frontier:
+
+        # Expand one whole layer of whichever frontier is smaller
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, reached, other = forward_frontier, forward, backward
+        else:
+            frontier, reached, other = backward_frontier, backward, forward
+
+        for _ in range(len(frontier)):
+            person_id = frontier.popleft()
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for movie_id, neighbour in neighbors_for_person(person_id):
+                if neighbour in reached:
+                    continue
+                reached[neighbour] = (movie_id, person_id)
+                if neighbour in other:
+                    return _join_paths(forward, backward, neighbour)
+                frontier.append(neighbour)
+
+    return None
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Builds the (movie_id, person_id) path through `meeting` from the
+    parent links of a bidirectional search.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def person_id_for_name(name, graph=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If `graph` is given, people's details are read from it
+    rather than from the `people` dict.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if graph is not None:
+        person_ids = list(graph.ids_for_name(name))
+    else:
+        person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            if graph is not None:
+                name = graph.name(person_id)
+                birth = graph.birth(person_id)
+            else:
+                person = people[person_id]
+                name = person["name"]
+                birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
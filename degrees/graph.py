@@ -0,0 +1,326 @@
+from array import array
+from collections import deque
+
+
+class CSRGraph():
+    """
+    Compact form of the person/movie star graph.
+
+    People and movies are interned to dense integers (their position in
+    `person_ids` and `movie_ids`), and the bipartite star relation is
+    stored twice in compressed sparse row form: the movies of person `p`
+    are `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, names, births, movie_ids, titles, years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self._person_index = None
+        self._movie_index = None
+        self._name_index = None
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a graph from the `people` and `movies` dicts
+        filled in by `degrees.load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {movie_id: m for m, movie_id in enumerate(movie_ids)}
+
+        edge_people = array("i")
+        edge_movies = array("i")
+        for p, person_id in enumerate(person_ids):
+            for movie_id in people[person_id]["movies"]:
+                edge_people.append(p)
+                edge_movies.append(movie_index[movie_id])
+
+        return cls.from_edges(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            edge_people,
+            edge_movies
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, names, births, movie_ids, titles, years,
+                   edge_people, edge_movies):
+        """
+        Builds a graph from parallel arrays of (person, movie) index pairs.
+        """
+        person_offsets, person_movies = compress(
+            len(person_ids), edge_people, edge_movies
+        )
+        movie_offsets, movie_people = compress(
+            len(movie_ids), edge_movies, edge_people
+        )
+        return cls(person_ids, names, births, movie_ids, titles, years,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    @property
+    def person_index(self):
+        """Maps person_ids to their dense index, built on first use."""
+        if self._person_index is None:
+            self._person_index = {
+                person_id: p for p, person_id in enumerate(self.person_ids)
+            }
+        return self._person_index
+
+    @property
+    def movie_index(self):
+        """Maps movie_ids to their dense index, built on first use."""
+        if self._movie_index is None:
+            self._movie_index = {
+                movie_id: m for m, movie_id in enumerate(self.movie_ids)
+            }
+        return self._movie_index
+
+    def ids_for_name(self, name):
+        """
+        Returns the set of person_ids whose lower-cased name is `name`,
+        building the name lookup on first use.
+        """
+        if self._name_index is None:
+            self._name_index = {}
+            for person_id, person_name in zip(self.person_ids, self.names):
+                self._name_index.setdefault(
+                    person_name.lower(), set()
+                ).add(person_id)
+        return self._name_index.get(name.lower(), set())
+
+    def name(self, person_id):
+        return self.names[self.person_index[person_id]]
+
+    def birth(self, person_id):
+        return self.births[self.person_index[person_id]]
+
+    def title(self, movie_id):
+        return self.titles[self.movie_index[movie_id]]
+
+    def neighbors(self, p):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with person index `p`.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for m in self.movies_of(p):
+            for q in movie_people[movie_offsets[m]:movie_offsets[m + 1]]:
+                yield m, q
+
+    def movies_of(self, p):
+        """Returns the movie indices person index `p` starred in."""
+        return self.person_movies[
+            self.person_offsets[p]:self.person_offsets[p + 1]
+        ]
+
+    def stars_of(self, m):
+        """Returns the person indices who starred in movie index `m`."""
+        return self.movie_people[
+            self.movie_offsets[m]:self.movie_offsets[m + 1]
+        ]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        movie_ids = self.movie_ids
+        person_ids = self.person_ids
+        return {
+            (movie_ids[m], person_ids[q])
+            for m, q in self.neighbors(self.person_index[person_id])
+        }
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+
+        If `stats` is a dict, the number of people whose neighbors were
+        expanded is accumulated in `stats["expanded"]`.
+        """
+        s = self.person_index[source]
+        t = self.person_index[target]
+        if s == t:
+            return []
+
+        # parent[q] is the person q was reached from, via movie via[q]
+        parent = array("i", [-1]) * len(self.person_ids)
+        via = array("i", [-1]) * len(self.person_ids)
+        parent[s] = s
+        frontier = deque([s])
+
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        while frontier:
+            p = frontier.popleft()
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for m in self.movies_of(p):
+                for q in movie_people[movie_offsets[m]:movie_offsets[m + 1]]:
+                    if parent[q] != -1:
+                        continue
+                    parent[q] = p
+                    via[q] = m
+                    if q == t:
+                        return self._walk(parent, via, s, t)
+                    frontier.append(q)
+
+        return None
+
+    def shortest_paths(self, source, targets, stats=None):
+        """
+        Returns a dict mapping each of `targets` to the shortest list of
+        (movie_id, person_id) pairs that connects the source to it, or to
+        None if there is no possible path.
+
+        A single breadth-first search from the source is shared by every
+        target and stops as soon as all of them have been reached.
+
+        If `stats` is a dict, the number of people whose neighbors were
+        expanded is accumulated in `stats["expanded"]`.
+        """
+        s = self.person_index[source]
+        remaining = {self.person_index[target] for target in targets}
+        remaining.discard(s)
+
+        parent = array("i", [-1]) * len(self.person_ids)
+        via = array("i", [-1]) * len(self.person_ids)
+        parent[s] = s
+        frontier = deque([s])
+
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        while frontier and remaining:
+            p = frontier.popleft()
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for m in self.movies_of(p):
+                for q in movie_people[movie_offsets[m]:movie_offsets[m + 1]]:
+                    if parent[q] != -1:
+                        continue
+                    parent[q] = p
+                    via[q] = m
+                    remaining.discard(q)
+                    frontier.append(q)
+
+        paths = {}
+        for target in targets:
+            t = self.person_index[target]
+            paths[target] = (None if parent[t] == -1
+                             else self._walk(parent, via, s, t))
+        return paths
+
+    def shortest_path_bidirectional(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, searching breadth-first
+        from both ends at once and always expanding the smaller frontier.
+
+        If no possible path, returns None.
+
+        If `stats` is a dict, the number of people whose neighbors were
+        expanded is accumulated in `stats["expanded"]`.
+        """
+        s = self.person_index[source]
+        t = self.person_index[target]
+        if s == t:
+            return []
+
+        # Each side maps a reached person to the (movie, person) step
+        # that links it back towards that side's starting person
+        forward = {s: None}
+        backward = {t: None}
+        forward_frontier = deque([s])
+        backward_frontier = deque([t])
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, reached, other = forward_frontier, forward, backward
+            else:
+                frontier, reached, other = backward_frontier, backward, forward
+
+            for _ in range(len(frontier)):
+                p = frontier.popleft()
+                if stats is not None:
+                    stats["expanded"] = stats.get("expanded", 0) + 1
+                for m in self.movies_of(p):
+                    for q in self.stars_of(m):
+                        if q in reached:
+                            continue
+                        reached[q] = (m, p)
+                        if q in other:
+                            return self.join_paths(forward, backward, q)
+                        frontier.append(q)
+
+        return None
+
+    def _walk(self, parent, via, s, t):
+        """
+        Follows parent links from `t` back to `s` and returns
+        the (movie_id, person_id) path between them.
+        """
+        path = []
+        q = t
+        while q != s:
+            path.append((self.movie_ids[via[q]], self.person_ids[q]))
+            q = parent[q]
+        path.reverse()
+        return path
+
+    def join_paths(self, forward, backward, meeting):
+        """
+        Builds the (movie_id, person_id) path through `meeting` from the
+        parent links of a bidirectional search.
+        """
+        steps = []
+        q = meeting
+        while forward[q] is not None:
+            m, p = forward[q]
+            steps.append((m, q))
+            q = p
+        steps.reverse()
+
+        q = meeting
+        while backward[q] is not None:
+            m, q = backward[q]
+            steps.append((m, q))
+        return [(self.movie_ids[m], self.person_ids[q]) for m, q in steps]
+
+
+def compress(count, keys, values):
+    """
+    Groups `values` by `keys` (both integer arrays of the same length)
+    into CSR form, returning (offsets, indices) where the values for
+    key k are indices[offsets[k]:offsets[k + 1]].
+    """
+    offsets = array("i", [0]) * (count + 1)
+    for k in keys:
+        offsets[k + 1] += 1
+    for k in range(count):
+        offsets[k + 1] += offsets[k]
+
+    cursor = offsets[:-1]
+    indices = array("i", [0]) * len(values)
+    for k, v in zip(keys, values):
+        indices[cursor[k]] = v
+        cursor[k] += 1
+    return offsets, indices
@@ -0,0 +1,170 @@
+import argparse
+import csv
+import sys
+import time
+from array import array
+
+from graph import CSRGraph
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+
+def ingest(directory, stats=None):
+    """
+    Stream the CSV files in `directory` into a CSRGraph.
+
+    A first pass over stars.csv interns every referenced person and movie
+    to an integer and keeps only the (person, movie) pairs as int arrays.
+    people.csv and movies.csv are then streamed keeping just the name and
+    birth, or title and year, of the people and movies stars.csv refers to.
+    People who starred in nothing, and stars rows naming unknown people or
+    movies, never take up any memory.
+
+    If `stats` is a dict, it is filled with the number of rows and seconds
+    spent on each file, keyed by file name.
+    """
+    if stats is None:
+        stats = {}
+
+    person_index = {}
+    movie_index = {}
+    edge_people = array("i")
+    edge_movies = array("i")
+    with Timed(stats, "stars.csv") as timed:
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            person_column = header.index("person_id")
+            movie_column = header.index("movie_id")
+            for row in reader:
+                timed.rows += 1
+                edge_people.append(person_index.setdefault(
+                    row[person_column], len(person_index)
+                ))
+                edge_movies.append(movie_index.setdefault(
+                    row[movie_column], len(movie_index)
+                ))
+
+    # Renumber people and movies in the order of their own files,
+    # leaving -1 for anything stars.csv mentions that they lack
+    with Timed(stats, "people.csv") as timed:
+        person_ids, names, births, person_remap = stream_records(
+            f"{directory}/people.csv", person_index, "name", "birth", timed
+        )
+    del person_index
+    with Timed(stats, "movies.csv") as timed:
+        movie_ids, titles, years, movie_remap = stream_records(
+            f"{directory}/movies.csv", movie_index, "title", "year", timed
+        )
+    del movie_index
+
+    kept_people = array("i")
+    kept_movies = array("i")
+    for p, m in zip(edge_people, edge_movies):
+        p = person_remap[p]
+        m = movie_remap[m]
+        if p != -1 and m != -1:
+            kept_people.append(p)
+            kept_movies.append(m)
+    del edge_people, edge_movies
+
+    return CSRGraph.from_edges(person_ids, names, births,
+                               movie_ids, titles, years,
+                               kept_people, kept_movies)
+
+
+def stream_records(filename, index, first, second, timed):
+    """
+    Streams the CSV `filename`, keeping the `first` and `second` columns
+    of rows whose id is a key of `index`.
+
+    Returns the kept ids and both columns as parallel lists, in file
+    order, with an array mapping each value of `index` to its position
+    in those lists (or -1 if the file has no row for it).
+    """
+    ids = []
+    firsts = []
+    seconds = []
+    remap = array("i", [-1]) * len(index)
+    with open(filename, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        id_column = header.index("id")
+        first_column = header.index(first)
+        second_column = header.index(second)
+        for row in reader:
+            timed.rows += 1
+            i = index.get(row[id_column])
+            if i is None or remap[i] != -1:
+                continue
+            remap[i] = len(ids)
+            ids.append(row[id_column])
+            firsts.append(row[first_column])
+            seconds.append(row[second_column])
+    return ids, firsts, seconds, remap
+
+
+class Timed():
+    """
+    Context manager recording the rows counted in `rows` and the elapsed
+    seconds of its block as stats[name].
+    """
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.rows = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats[self.name] = {
+            "rows": self.rows,
+            "seconds": time.perf_counter() - self.start,
+        }
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in bytes,
+    or None where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream a degrees data directory into memory "
+                    "and report ingest throughput."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+
+    stats = {}
+    graph = ingest(args.directory, stats)
+
+    print(f"{'file':<12}{'rows':>12}{'seconds':>10}{'rows/sec':>12}")
+    for name, entry in stats.items():
+        rate = entry["rows"] / entry["seconds"] if entry["seconds"] else 0
+        print(f"{name:<12}{entry['rows']:>12}{entry['seconds']:>10.2f}"
+              f"{rate:>12.0f}")
+    print(f"Kept {len(graph.person_ids)} people, {len(graph.movie_ids)} "
+          f"movies and {len(graph.person_movies)} star credits.")
+
+    peak = peak_rss()
+    if peak is not None:
+        print(f"Peak RSS: {peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+
+import degrees
+import snapshot
+
+MAGIC = b"DEGLMK\0\0"
+VERSION = 1
+
+FILENAME = "degrees.landmarks"
+
+# Distances are stored in one byte each, with this marking "unreachable"
+UNREACHABLE = 255
+
+# magic, version, snapshot version (person numbering), landmark count,
+# person count, then the CSV fingerprint
+HEADER = struct.Struct(f"<8sIIII{2 * len(snapshot.SOURCES)}q")
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few landmark people to everyone else,
+    where `distances[i][p]` is the degree of separation between landmark
+    `landmarks[i]` and person index `p`, and `eccentricities[i]` is the
+    largest finite distance from that landmark.
+
+    By the triangle inequality the distances give instant lower and upper
+    bounds on the degree of separation between any two people, which also
+    prune the search for a path between them.
+    """
+
+    def __init__(self, landmarks, eccentricities, distances):
+        self.landmarks = landmarks
+        self.eccentricities = eccentricities
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count):
+        """
+        Picks `count` landmarks from `graph` and computes their distances.
+
+        Landmarks are the people who starred in the most movies, skipping
+        anyone who co-starred with a landmark already picked: well-connected
+        landmarks give tight upper bounds, and spacing them apart keeps their
+        lower bounds from all saying the same thing.
+        """
+        offsets = graph.person_offsets
+        n = len(graph.person_ids)
+        by_degree = sorted(range(n), key=lambda p: offsets[p] - offsets[p + 1])
+
+        landmarks = array("i")
+        eccentricities = array("i")
+        distances = []
+        for candidate in by_degree:
+            if len(landmarks) == count:
+                break
+            if any(row[candidate] <= 1 for row in distances):
+                continue
+            row = bfs_distances(graph, candidate)
+            landmarks.append(candidate)
+            eccentricities.append(max(row.replace(bytes([UNREACHABLE]), b"")))
+            distances.append(row)
+        return cls(landmarks, eccentricities, distances)
+
+    def bounds(self, s, t):
+        """
+        Returns (lower, upper) bounds on the degree of separation between
+        person indices `s` and `t`, with `upper` None if no landmark reaches
+        both. Returns None if the landmarks prove they are not connected.
+        """
+        lower = 0
+        upper = None
+        for row in self.distances:
+            ds = row[s]
+            dt = row[t]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            elif ds == UNREACHABLE or dt == UNREACHABLE:
+                return None
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def pruning_rows(self, p, slack):
+        """
+        Returns (distances, distance to `p`) for the landmarks that could
+        give a lower bound above `slack` between person index `p` and
+        anyone connected to them.
+        """
+        rows = []
+        for row, eccentricity in zip(self.distances, self.eccentricities):
+            d = row[p]
+            if d != UNREACHABLE and max(d, eccentricity - d) > slack:
+                rows.append((row, d))
+        return rows
+
+    def shortest_path(self, graph, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        The search is a bidirectional breadth-first search that, A*-style,
+        drops every frontier person whose depth plus landmark lower bound to
+        the far end exceeds the landmark upper bound, since no shortest path
+        can run through them. The bound is checked once per person as each
+        layer starts, not for every co-star found while expanding it, so
+        pruning costs less than the expansions it saves. Once the next layer
+        could not beat the upper bound, the path through the landmark is
+        returned instead. If no possible path, returns None.
+
+        If `stats` is a dict, the number of people whose neighbors were
+        expanded is accumulated in `stats["expanded"]`.
+        """
+        s = graph.person_index[source]
+        t = graph.person_index[target]
+        if s == t:
+            return []
+        bounds = self.bounds(s, t)
+        if bounds is None:
+            return None
+        _, upper = bounds
+
+        forward = {s: None}
+        backward = {t: None}
+        forward_frontier = deque([s])
+        backward_frontier = deque([t])
+        forward_depth = 0
+        backward_depth = 0
+
+        while forward_frontier and backward_frontier:
+
+            # The next layer could at best find a path as long as the one
+            # through the nearest landmark, so follow that one instead
+            searched = forward_depth + backward_depth
+            if upper is not None and searched + 1 >= upper:
+                return self.landmark_path(graph, s, t)
+
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, reached, other = forward_frontier, forward, backward
+                forward_depth += 1
+                depth, end = forward_depth, t
+            else:
+                frontier, reached, other = backward_frontier, backward, forward
+                backward_depth += 1
+                depth, end = backward_depth, s
+
+            # The frontier is at depth - 1, so only pay for lower bounds from
+            # landmarks that could prune there
+            slack = None if upper is None else upper - depth + 1
+            rows = [] if slack is None else self.pruning_rows(end, slack)
+            if rows:
+                kept = [
+                    p for p in frontier
+                    if not any(abs(row[p] - d) > slack for row, d in rows)
+                ]
+                frontier.clear()
+                frontier.extend(kept)
+
+            for _ in range(len(frontier)):
+                p = frontier.popleft()
+                if stats is not None:
+                    stats["expanded"] = stats.get("expanded", 0) + 1
+                for m in graph.movies_of(p):
+                    for q in graph.stars_of(m):
+                        if q in reached:
+                            continue
+                        reached[q] = (m, p)
+                        if q in other:
+                            return graph.join_paths(forward, backward, q)
+                        frontier.append(q)
+
+        return None
+
+    def landmark_path(self, graph, s, t):
+        """
+        Returns the (movie_id, person_id) path from person index `s` to
+        `t` through the landmark giving the upper bound on their degree of
+        separation, or None if no landmark reaches both.
+
+        The path is found without searching by stepping from each end to
+        a co-star one degree closer to the landmark until reaching it.
+        """
+        best = None
+        for row in self.distances:
+            if row[s] != UNREACHABLE and row[t] != UNREACHABLE:
+                if best is None or row[s] + row[t] < best[s] + best[t]:
+                    best = row
+        if best is None:
+            return None
+
+        def descend(p):
+            """
+            Returns the (movie, person) index steps from `p` down to the
+            landmark of `best`.
+            """
+            steps = []
+            while best[p] != 0:
+                p, m = next(
+                    (q, m) for m in graph.movies_of(p)
+                    for q in graph.stars_of(m) if best[q] == best[p] - 1
+                )
+                steps.append((m, p))
+            return steps
+
+        steps = descend(s)
+        to_target = descend(t)
+        people = [t] + [q for _, q in to_target]
+        for i in range(len(to_target) - 1, -1, -1):
+            steps.append((to_target[i][0], people[i]))
+        return [(graph.movie_ids[m], graph.person_ids[q]) for m, q in steps]
+
+    def save(self, directory):
+        """Writes the index to `directory` for the CSV files there."""
+        n = len(self.distances[0]) if self.distances else 0
+        path = os.path.join(directory, FILENAME)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, snapshot.VERSION,
+                                len(self.landmarks), n,
+                                *snapshot.fingerprint(directory)))
+            f.write(array("i", self.landmarks).tobytes())
+            f.write(array("i", self.eccentricities).tobytes())
+            for row in self.distances:
+                f.write(row)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-maps the index in `directory`, or returns None if it is
+        missing or was built from different CSV files.
+        """
+        path = os.path.join(directory, FILENAME)
+        try:
+            with open(path, "rb") as f:
+                magic, version, numbering, count, n, *key = HEADER.unpack(
+                    f.read(HEADER.size)
+                )
+                if (magic != MAGIC or version != VERSION
+                        or numbering != snapshot.VERSION
+                        or tuple(key) != snapshot.fingerprint(directory)):
+                    return None
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, struct.error):
+            return None
+
+        view = memoryview(buffer)
+        start = HEADER.size
+        landmarks = view[start:start + 4 * count].cast("i")
+        start += 4 * count
+        eccentricities = view[start:start + 4 * count].cast("i")
+        start += 4 * count
+        distances = [view[start + i * n:start + (i + 1) * n]
+                     for i in range(count)]
+        return cls(landmarks, eccentricities, distances)
+
+
+def bfs_distances(graph, s):
+    """
+    Returns a bytearray of the degree of separation from person index `s`
+    to every person, capped just below UNREACHABLE.
+    """
+    distances = bytearray([UNREACHABLE]) * len(graph.person_ids)
+    distances[s] = 0
+    frontier = deque([s])
+    while frontier:
+        p = frontier.popleft()
+        d = min(distances[p] + 1, UNREACHABLE - 1)
+        for m in graph.movies_of(p):
+            for q in graph.stars_of(m):
+                if distances[q] == UNREACHABLE:
+                    distances[q] = d
+                    frontier.append(q)
+    return distances
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or query the landmark distance index."
+    )
+    parser.add_argument("command", choices=["build", "query"])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("-k", "--landmarks", type=int, default=16,
+                        help="number of landmarks to build")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = degrees.load_graph(args.directory)
+    print("Data loaded.")
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = LandmarkIndex.build(graph, args.landmarks)
+        index.save(args.directory)
+        elapsed = time.perf_counter() - start
+        print(f"Built {len(index.landmarks)} landmarks in {elapsed:.1f}s.")
+        return
+
+    index = LandmarkIndex.load(args.directory)
+    if index is None:
+        sys.exit("No current landmark index; run the build command first.")
+
+    source = degrees.person_id_for_name(input("Name: "), graph)
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "), graph)
+    if target is None:
+        sys.exit("Person not found.")
+
+    bounds = index.bounds(graph.person_index[source],
+                          graph.person_index[target])
+    if bounds is None:
+        print("Not connected.")
+    else:
+        lower, upper = bounds
+        if upper is None:
+            print(f"At least {lower} degrees of separation.")
+        else:
+            print(f"Between {lower} and {upper} degrees of separation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# People per block of the range-minimum index used for prefix completion
+BLOCK = 64
+
+# Trigram occurrences a fuzzy candidate must share with the query beyond
+# those its allowed edits could destroy
+SHARED = 3
+# Most fuzzy candidates whose edit distance is computed, those sharing
+# the most trigrams with the query first
+VERIFIED = 256
+
+
+class NameIndex():
+    """
+    Lookup of people by name supporting exact, prefix and
+    bounded edit-distance queries.
+
+    Distinct normalized names are kept sorted in `keys` for prefix
+    completion, with `people[k]` holding the person indices that share
+    `keys[k]`, best-ranked first. Every key is also posted under each of
+    its padded trigrams in `grams`, which narrows fuzzy queries down to a
+    few candidates before their edit distance is computed.
+
+    For completion, people are also laid out key by key, so everyone
+    under a prefix is one run of positions. `ranks` holds each position's
+    rank (0 for the most popular person) and `blocks` the lowest rank in
+    every aligned run of 2 ** j blocks of BLOCK positions, so the best
+    person in any run is found in constant time and the best `limit` in
+    a few times `limit` lookups, however many names share the prefix.
+    """
+
+    def __init__(self, person_ids, names, births, popularity=None):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.popularity = popularity
+
+        by_key = {}
+        for p, name in enumerate(names):
+            by_key.setdefault(normalize(name), array("i")).append(p)
+        self.keys = sorted(by_key)
+        self.people = [by_key.pop(key) for key in self.keys]
+        self.lookup = {key: k for k, key in enumerate(self.keys)}
+
+        self.grams = {}
+        self.by_length = {}
+        for k, key in enumerate(self.keys):
+            for gram in set(trigrams(key)):
+                self.grams.setdefault(gram, array("i")).append(k)
+            self.by_length.setdefault(len(key), array("i")).append(k)
+
+        # order[r] is the person ranked r; sorting by name and then,
+        # stably, by popularity gives the order of `_rank_key`
+        self.order = array("i", sorted(range(len(names)),
+                                       key=names.__getitem__))
+        if popularity is not None:
+            self.order = array("i", sorted(self.order,
+                                           key=popularity.__getitem__,
+                                           reverse=True))
+        rank = array("i", bytes(4 * len(names)))
+        for r, p in enumerate(self.order):
+            rank[p] = r
+        self.people = [
+            array("i", sorted(people, key=rank.__getitem__))
+            if len(people) > 1 else people
+            for people in self.people
+        ]
+
+        # starts[k] is the first position of key k's people
+        self.starts = array("i", [0])
+        self.ranks = array("i")
+        for people in self.people:
+            self.ranks.extend(rank[p] for p in people)
+            self.starts.append(len(self.ranks))
+        self.positions = array("i", bytes(4 * len(names)))
+        for position, r in enumerate(self.ranks):
+            self.positions[r] = position
+
+        # blocks[j][b] is the lowest rank in blocks b to b + 2 ** j - 1
+        level = array("i", (min(self.ranks[i:i + BLOCK])
+                            for i in range(0, len(self.ranks), BLOCK)))
+        self.blocks = [level]
+        count = len(level)
+        width = 1
+        while 2 * width <= count:
+            level = array("i", (min(level[b], level[b + width])
+                                for b in range(count - 2 * width + 1)))
+            self.blocks.append(level)
+            width *= 2
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Builds an index over every person in a CSRGraph,
+        ranking people who starred in more movies first.
+        """
+        offsets = graph.person_offsets
+        popularity = array(
+            "i", (offsets[p + 1] - offsets[p] for p in range(len(offsets) - 1))
+        )
+        return cls(graph.person_ids, graph.names, graph.births, popularity)
+
+    def exact(self, name):
+        """Returns the ranked candidates whose name is exactly `name`."""
+        k = self.lookup.get(normalize(name))
+        if k is None:
+            return []
+        return self._rank([(0, p) for p in self.people[k]])
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` ranked candidates whose name starts with
+        `prefix`.
+        """
+        prefix = normalize(prefix)
+        # Keys starting with `prefix` sort from it up to, but not
+        # including, it followed by the last code point
+        first = self.starts[bisect_left(self.keys, prefix)]
+        end = self.starts[bisect_left(self.keys, prefix + "\U0010ffff")]
+
+        # Take the best-ranked person in the best run, splitting the run
+        # around them, until there are `limit` people
+        best = []
+        runs = []
+        self._push_run(runs, first, end)
+        while runs and len(best) < limit:
+            r, start, stop = heapq.heappop(runs)
+            best.append((0, self.order[r]))
+            position = self.positions[r]
+            self._push_run(runs, start, position)
+            self._push_run(runs, position + 1, stop)
+        return self._rank(best)
+
+    def _push_run(self, runs, start, stop):
+        """
+        Pushes the run of positions from `start` to `stop` onto the heap
+        `runs`, keyed by the lowest rank in it, unless it is empty.
+        """
+        if start < stop:
+            heapq.heappush(runs, (self._lowest_rank(start, stop),
+                                  start, stop))
+
+    def _lowest_rank(self, start, stop):
+        """Returns the lowest rank at positions `start` to `stop` - 1."""
+        ranks = self.ranks
+        first = -(-start // BLOCK)
+        end = stop // BLOCK
+        if first >= end:
+            return min(ranks[start:stop])
+        # Whole blocks from `first` to `end` - 1, covered by two
+        # overlapping runs of 2 ** j blocks, plus the partial blocks
+        # on either side
+        j = (end - first).bit_length() - 1
+        level = self.blocks[j]
+        lowest = min(level[first], level[end - (1 << j)])
+        if start < first * BLOCK:
+            lowest = min(lowest, min(ranks[start:first * BLOCK]))
+        if end * BLOCK < stop:
+            lowest = min(lowest, min(ranks[end * BLOCK:stop]))
+        return lowest
+
+    def search(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` candidates whose name is within
+        `max_distance` edits of `name`, closest and most popular first.
+        """
+        query = normalize(name)
+        matches = []
+        for k in self._fuzzy_keys(query, max_distance):
+            distance = edit_distance(query, self.keys[k], max_distance)
+            if distance <= max_distance:
+                matches.extend((distance, p) for p in self.people[k][:limit])
+        return self._rank(matches)[:limit]
+
+    def _fuzzy_keys(self, query, max_distance):
+        """
+        Returns the indices of keys that might be within `max_distance`
+        edits of `query`, at most VERIFIED of them, sharing the most
+        trigram occurrences with it first.
+        """
+        occurrences = Counter(trigrams(query))
+        # Each edit destroys at most 3 of the query's trigram occurrences
+        lost = 3 * max_distance
+
+        if sum(occurrences.values()) <= lost:
+            # Too short to filter on trigrams: fall back to every key
+            # of a compatible length
+            keys = set()
+            for length in range(len(query) - max_distance,
+                                len(query) + max_distance + 1):
+                keys.update(self.by_length.get(length, ()))
+            return keys
+
+        # Count, for every key, the occurrences it shares among the
+        # rarest trigrams covering `lost` + SHARED occurrences; a match
+        # shares all but `lost` of them
+        counts = Counter()
+        covered = 0
+        for gram in sorted(occurrences,
+                           key=lambda gram: len(self.grams.get(gram, ()))):
+            for _ in range(occurrences[gram]):
+                counts.update(self.grams.get(gram, ()))
+            covered += occurrences[gram]
+            if covered >= lost + SHARED:
+                break
+        least = covered - lost
+
+        candidates = [
+            k for k, count in counts.items()
+            if count >= least
+            and abs(len(self.keys[k]) - len(query)) <= max_distance
+        ]
+        return heapq.nlargest(VERIFIED, candidates, key=counts.__getitem__)
+
+    def _rank_key(self, p):
+        """Returns the key ordering people by popularity, then name."""
+        popularity = self.popularity
+        return (-popularity[p] if popularity is not None else 0,
+                self.names[p])
+
+    def _rank(self, matches):
+        """
+        Turns (distance, person index) pairs into candidate dicts,
+        ordered by distance, then popularity, then name.
+        """
+        matches.sort(key=lambda match: (match[0], self._rank_key(match[1])))
+        return [
+            {
+                "person_id": self.person_ids[p],
+                "name": self.names[p],
+                "birth": self.births[p],
+                "distance": distance,
+            }
+            for distance, p in matches
+        ]
+
+
+def normalize(name):
+    """Lower-cases `name` and collapses its whitespace."""
+    return " ".join(name.lower().split())
+
+
+def trigrams(key):
+    """Returns the trigrams of `key` padded with two spaces on each side."""
+    padded = f"  {key}  "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, bound):
+    """
+    Returns the Levenshtein distance between `a` and `b`,
+    or `bound + 1` as soon as it is known to exceed `bound`.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+
+from degrees import load_graph
+from nameindex import NameIndex
+
+
+class ResolveError(LookupError):
+    """
+    Raised when a name does not pick out exactly one person, carrying the
+    ranked `candidates` the caller might have meant.
+    """
+
+    def __init__(self, message, candidates):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def parse_query(line):
+    """
+    Parses one query line into a dict.
+
+    A line is either a JSON object or two names separated by a tab,
+    which is shorthand for {"source": ..., "target": ...}. Besides path
+    queries, {"complete": prefix} and {"search": name} look up names.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        query = json.loads(line)
+        check_query(query)
+        return query
+    names = line.split("\t")
+    if len(names) != 2:
+        raise ValueError("expected a JSON object or two tab-separated names")
+    source, target = names
+    return {"source": source, "target": target}
+
+
+def check_query(query):
+    """
+    Raises ValueError if `query` is not a query dict that `answer` can
+    answer: a path query needs string "source" and "target" names, and
+    "complete" and "search" queries need a string.
+    """
+    if not isinstance(query, dict):
+        raise ValueError("query must be an object")
+    for key in ["complete", "search"]:
+        if key in query:
+            if not isinstance(query[key], str):
+                raise ValueError(f"{key} must be a string")
+            return
+    for key in ["source", "target"]:
+        if not isinstance(query.get(key), str):
+            raise ValueError(f"{key} must be a string")
+
+
+def resolve(graph, index, name):
+    """
+    Returns the person_id for `name`, without asking which person is
+    meant. A person_id may be given in place of a name to pick one person
+    out of several sharing it. Raises ResolveError if the name is unknown
+    or ambiguous.
+    """
+    candidates = index.exact(name)
+    if len(candidates) == 1:
+        return candidates[0]["person_id"]
+    elif len(candidates) > 1:
+        raise ResolveError(f"ambiguous name: {name}", candidates)
+    elif name in graph.person_index:
+        return name
+    raise ResolveError(f"person not found: {name}", index.search(name))
+
+
+def describe(graph, source_id, target_id, path):
+    """
+    Returns the JSON-serializable result for a path found
+    between `source_id` and `target_id`.
+    """
+    result = {
+        "source": source_id,
+        "target": target_id,
+        "degrees": None if path is None else len(path),
+        "path": None,
+    }
+    if path is not None:
+        result["path"] = [
+            {
+                "movie_id": movie_id,
+                "title": graph.title(movie_id),
+                "person_id": person_id,
+                "name": graph.name(person_id),
+            }
+            for movie_id, person_id in path
+        ]
+    return result
+
+
+def failure(query, e):
+    """Returns the result reporting that `query` could not be resolved."""
+    result = dict(query)
+    result["error"] = str(e)
+    result["candidates"] = e.candidates
+    return result
+
+
+def answer(graph, index, query):
+    """
+    Answers a single query dict as parsed by `parse_query`.
+    """
+    if "complete" in query:
+        return {"complete": query["complete"],
+                "candidates": index.prefix(query["complete"])}
+    elif "search" in query:
+        return {"search": query["search"],
+                "candidates": index.search(query["search"])}
+
+    try:
+        source_id = resolve(graph, index, query["source"])
+        target_id = resolve(graph, index, query["target"])
+    except ResolveError as e:
+        return failure(query, e)
+    path = graph.shortest_path_bidirectional(source_id, target_id)
+    return describe(graph, source_id, target_id, path)
+
+
+def answer_batch(graph, index, queries):
+    """
+    Yields a result for every query in `queries`, a query dict or a line
+    for `parse_query`, tagged with its position as "query".
+
+    Path queries that share a source are answered by one search from it,
+    so results are yielded grouped by source rather than in input order.
+    Malformed queries get an error result instead.
+    """
+    by_source = {}
+    for i, query in enumerate(queries):
+        try:
+            if isinstance(query, str):
+                query = parse_query(query)
+            else:
+                check_query(query)
+        except ValueError as e:
+            yield {"error": f"malformed query: {e}", "query": i}
+            continue
+        if "source" not in query:
+            result = answer(graph, index, query)
+            result["query"] = i
+            yield result
+            continue
+        try:
+            source_id = resolve(graph, index, query["source"])
+            target_id = resolve(graph, index, query["target"])
+        except ResolveError as e:
+            result = failure(query, e)
+            result["query"] = i
+            yield result
+            continue
+        by_source.setdefault(source_id, []).append((i, target_id))
+
+    for source_id, targets in by_source.items():
+        paths = graph.shortest_paths(
+            source_id, [target_id for _, target_id in targets]
+        )
+        for i, target_id in targets:
+            result = describe(graph, source_id, target_id, paths[target_id])
+            result["query"] = i
+            yield result
+
+
+def serve_lines(graph, index, infile, outfile):
+    """
+    Answers one query per line of `infile` until it is exhausted,
+    writing each result to `outfile` as a JSON line as soon as it is known.
+    """
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            result = answer(graph, index, parse_query(line))
+        except (ValueError, KeyError):
+            result = {"error": f"malformed query: {line.strip()}"}
+        outfile.write(json.dumps(result) + "\n")
+        outfile.flush()
+
+
+def serve_socket(graph, index, path):
+    """
+    Listens on the Unix socket `path`, answering the line protocol
+    of `serve_lines` for every client that connects.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            infile = (line.decode("utf-8") for line in self.rfile)
+            serve_lines(graph, index, infile, Writer(self.wfile))
+
+    class Writer():
+
+        def __init__(self, wfile):
+            self.wfile = wfile
+
+        def write(self, text):
+            self.wfile.write(text.encode("utf-8"))
+
+        def flush(self):
+            self.wfile.flush()
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries "
+                    "from one loaded graph."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--queries",
+                        help="file of query lines to answer as one batch")
+    parser.add_argument("--socket",
+                        help="Unix socket path to serve queries on")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor write the csr snapshot")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    graph = load_graph(args.directory, cache=not args.no_cache)
+    index = NameIndex.from_graph(graph)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line for line in f if line.strip()]
+        for result in answer_batch(graph, index, queries):
+            print(json.dumps(result), flush=True)
+    elif args.socket:
+        serve_socket(graph, index, args.socket)
+    else:
+        serve_lines(graph, index, sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CSRGraph
+
+# Bump whenever the layout or contents change so stale snapshots are rebuilt
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Sections in file order: integer arrays, then (offsets, blob) string tables
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_people"]
+STRINGS = ["person_ids", "names", "births", "movie_ids", "titles", "years"]
+
+# magic, version, byte order, then (size, mtime_ns) for each source file
+HEADER = struct.Struct(f"<8sIB{2 * len(SOURCES)}q")
+# (start, length) in bytes of every section
+SECTION = struct.Struct("<qq")
+SECTION_COUNT = len(ARRAYS) + 2 * len(STRINGS)
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as UTF-8 in one buffer,
+    where string i is blob[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def fingerprint(directory):
+    """
+    Returns the (size, mtime_ns) pairs of the CSV files in `directory`,
+    flattened into one tuple.
+    """
+    key = []
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        key.extend([stat.st_size, stat.st_mtime_ns])
+    return tuple(key)
+
+
+def header(directory):
+    """Returns the header bytes a current snapshot of `directory` has."""
+    byteorder = 0 if sys.byteorder == "little" else 1
+    return HEADER.pack(MAGIC, VERSION, byteorder, *fingerprint(directory))
+
+
+def save(directory, graph):
+    """
+    Writes `graph` as a snapshot in `directory`, replacing any previous one.
+    Failure to write (e.g. a read-only directory) is not an error.
+    """
+    sections = []
+    for name in ARRAYS:
+        sections.append(array("i", getattr(graph, name)).tobytes())
+    for name in STRINGS:
+        encoded = [s.encode("utf-8") for s in getattr(graph, name)]
+        offsets = array("i", [0])
+        for s in encoded:
+            offsets.append(offsets[-1] + len(s))
+        sections.append(offsets.tobytes())
+        sections.append(b"".join(encoded))
+
+    path = os.path.join(directory, FILENAME)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(header(directory))
+            start = HEADER.size + SECTION.size * SECTION_COUNT
+            table = []
+            for section in sections:
+                # Keep every section 8-byte aligned for casting
+                start += -start % 8
+                table.append(SECTION.pack(start, len(section)))
+                start += len(section)
+            f.write(b"".join(table))
+            for section in sections:
+                f.write(b"\0" * (-f.tell() % 8))
+                f.write(section)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def load(directory):
+    """
+    Memory-maps the snapshot in `directory` and returns it as a CSRGraph,
+    or returns None if there is no snapshot or any CSV file has changed
+    since it was written.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            if f.read(HEADER.size) != header(directory):
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    sections = []
+    for i in range(SECTION_COUNT):
+        start, length = SECTION.unpack_from(
+            buffer, HEADER.size + i * SECTION.size
+        )
+        sections.append(view[start:start + length])
+
+    fields = {}
+    for name in ARRAYS:
+        fields[name] = sections.pop(0).cast("i")
+    for name in STRINGS:
+        offsets = sections.pop(0).cast("i")
+        fields[name] = StringTable(offsets, sections.pop(0))
+    return CSRGraph(**fields)
@@ -0,0 +1,165 @@
+import argparse
+import random
+import time
+
+import compiled
+import puzzle
+import sat
+import vectorized
+from logic import (And, Biconditional, Implication, Not, Or, Symbol,
+                   ENTAILED, entailments, model_check)
+
+
+def generate(people, rng):
+    """
+    Returns (knowledge, symbols) for a random knights and knaves puzzle
+    with `people` characters, each of whom makes one statement about
+    the others. Statements are chosen so that some random assignment of
+    knights and knaves is consistent with them.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+    truth = {}
+    for knight, knave in zip(knights, knaves):
+        truth[knight.name] = rng.random() < 0.5
+        truth[knave.name] = not truth[knight.name]
+
+    def claim(depth):
+        if depth == 0 or rng.random() < 0.3:
+            return rng.choice(knights + knaves)
+        kind = rng.randrange(5)
+        if kind == 0:
+            return Not(claim(depth - 1))
+        if kind == 1:
+            return And(claim(depth - 1), claim(depth - 1))
+        if kind == 2:
+            return Or(claim(depth - 1), claim(depth - 1))
+        if kind == 3:
+            return Implication(claim(depth - 1), claim(depth - 1))
+        return Biconditional(claim(depth - 1), claim(depth - 1))
+
+    conjuncts = []
+    for knight, knave in zip(knights, knaves):
+        # Each character is either a knight or a knave
+        conjuncts.append(And(Or(knight, knave), Not(And(knight, knave))))
+        statement = claim(2)
+        if statement.evaluate(truth) != truth[knight.name]:
+            statement = Not(statement)
+        conjuncts.append(Implication(knight, statement))
+        conjuncts.append(Implication(knave, Not(statement)))
+    return And(*conjuncts), knights + knaves
+
+
+def solve(check, knowledge, symbols):
+    """
+    Returns the symbols `check` finds entailed by `knowledge`,
+    and the seconds it took.
+    """
+    start = time.perf_counter()
+    entailed = [symbol for symbol in symbols if check(knowledge, symbol)]
+    return entailed, time.perf_counter() - start
+
+
+def solve_batch(knowledge, symbols):
+    """
+    Returns the symbols `entailments` finds entailed by `knowledge`,
+    and the seconds it took.
+    """
+    start = time.perf_counter()
+    answers = entailments(knowledge, symbols)
+    entailed = [symbol for symbol, answer in zip(symbols, answers)
+                if answer == ENTAILED]
+    return entailed, time.perf_counter() - start
+
+
+def time_puzzles(checks, repeat):
+    """
+    Prints how long each of `checks` takes to solve every puzzle
+    in puzzle.py `repeat` times.
+    """
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [puzzle.knowledge0, puzzle.knowledge1,
+               puzzle.knowledge2, puzzle.knowledge3]
+    print(f"{'puzzle.py':<12}{'ms':>10}")
+    for name, check in checks:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for knowledge in puzzles:
+                solve(check, knowledge, symbols)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{name:<12}{elapsed * 1000:>10.2f}")
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for knowledge in puzzles:
+            solve_batch(knowledge, symbols)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{'batch':<12}{elapsed * 1000:>10.2f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the model checkers and the SAT solver "
+                    "on generated knights and knaves puzzles."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[2, 4, 6, 8, 10, 12, 14, 20, 40, 80],
+                        help="numbers of characters to generate puzzles for")
+    parser.add_argument("--enumerate-limit", type=int, default=16,
+                        help="largest number of symbols to enumerate "
+                             "every model for")
+    parser.add_argument("--prune-limit", type=int, default=40,
+                        help="largest number of symbols to search "
+                             "partial models for")
+    parser.add_argument("--vectorize-limit", type=int, default=28,
+                        help="largest number of symbols to check with "
+                             "packed truth tables")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="times to solve the puzzle.py puzzles")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    time_puzzles([("pruned", model_check),
+                  ("compiled", compiled.model_check),
+                  ("vectorized", vectorized.model_check),
+                  ("sat", sat.model_check)], args.repeat)
+
+    rng = random.Random(args.seed)
+    print(f"{'people':>8}{'symbols':>9}{'entailed':>10}"
+          f"{'pruned s':>10}{'models':>10}{'batch s':>10}{'compiled s':>12}"
+          f"{'vectorized s':>14}{'sat s':>10}")
+    for people in args.sizes:
+        knowledge, symbols = generate(people, rng)
+        entailed, sat_time = solve(sat.model_check, knowledge, symbols)
+        times = []
+        stats = {"models": 0}
+
+        def pruned(knowledge, query):
+            return model_check(knowledge, query, stats)
+
+        for check, limit in [(pruned, args.prune_limit),
+                             (compiled.model_check, args.enumerate_limit),
+                             (vectorized.model_check, args.vectorize_limit)]:
+            if len(symbols) > limit:
+                times.append("-")
+                continue
+            expected, elapsed = solve(check, knowledge, symbols)
+            if expected != entailed:
+                raise RuntimeError(f"results disagree on {people} people")
+            times.append(f"{elapsed:.3f}")
+        if len(symbols) > args.prune_limit:
+            batch = "-"
+        else:
+            expected, elapsed = solve_batch(knowledge, symbols)
+            if expected != entailed:
+                raise RuntimeError(f"results disagree on {people} people")
+            batch = f"{elapsed:.3f}"
+        models = stats["models"] if times[0] != "-" else "-"
+        print(f"{people:>8}{len(symbols):>9}{len(entailed):>10}"
+              f"{times[0]:>10}{models:>10}{batch:>10}{times[1]:>12}"
+              f"{times[2]:>14}{sat_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
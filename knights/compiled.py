@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def expression(sentence, index):
+    """
+    Returns Python source for `sentence` as a boolean expression over
+    an integer `m`, where symbol `name` is true if bit index[name] of
+    `m` is set.
+    """
+    if isinstance(sentence, Symbol):
+        return f"(m & {1 << index[sentence.name]} != 0)"
+    if isinstance(sentence, Not):
+        return f"(not {expression(sentence.operand, index)})"
+    if isinstance(sentence, And):
+        if not sentence.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            expression(conjunct, index) for conjunct in sentence.conjuncts
+        ) + ")"
+    if isinstance(sentence, Or):
+        if not sentence.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            expression(disjunct, index) for disjunct in sentence.disjuncts
+        ) + ")"
+    if isinstance(sentence, Implication):
+        antecedent = expression(sentence.antecedent, index)
+        consequent = expression(sentence.consequent, index)
+        return f"(not {antecedent} or {consequent})"
+    if isinstance(sentence, Biconditional):
+        left = expression(sentence.left, index)
+        right = expression(sentence.right, index)
+        return f"({left} == {right})"
+    raise TypeError(f"cannot compile {sentence!r}")
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function of one integer `m` that evaluates `sentence` in the
+    model where the i-th of `symbols` (a list of names) is true if bit i
+    of `m` is set, with no dictionary lookups or method calls.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    return compile_source(f"lambda m: {expression(sentence, index)}")
+
+
+@lru_cache(maxsize=256)
+def compile_source(source):
+    """
+    Returns the function defined by lambda expression `source`, compiling
+    each distinct source only once.
+    """
+    return eval(compile(source, "<sentence>", "eval"))
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by running both compiled
+    over every model numbered as an integer.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    knowledge = compile_sentence(knowledge, symbols)
+    query = compile_sentence(query, symbols)
+    for m in range(1 << len(symbols)):
+        if knowledge(m) and not query(m):
+            return False
+    return True
@@ -1,19 +1,132 @@
 import itertools
+import sys
+import threading
+
+# Answers of `entailments`
+ENTAILED = "entailed"
+CONTRADICTED = "contradicted"
+UNDETERMINED = "undetermined"
+
+# Held while the intern tables are read or changed; reentrant since
+# interning a sentence can sweep the tables
+interning = threading.RLock()
 
 
 class Sentence():
+    """
+    Logical sentences are immutable and hash-consed: creating a sentence
+    structurally equal to one that already exists returns that same
+    object, so equal sentences are identical, and equality and hashing
+    are those of object identity, with no recursion.
+
+    The intern tables refer to their sentences strongly, which takes far
+    less memory per sentence than weak references would. Sentences
+    nothing else refers to any more are swept out of them each time their
+    number doubles.
+
+    Sweeping tells those sentences apart by their reference counts, so it
+    relies on CPython's reference counting and on `sys.getrefcount`; other
+    implementations would need weak references instead. Interning and
+    sweeping hold the module's `interning` lock, so sentences can be
+    created from several threads.
+    """
+
+    __slots__ = ("_symbols",)
+
+    # Every sentence of each class, keyed by what it is made of
+    interned = dict()
+    # How many sentences the tables hold, and how many to sweep them at
+    size = 0
+    sweep_at = 1024
+
+    @classmethod
+    def intern(cls, key, **fields):
+        """
+        Returns the sentence of this class identified by `key`, creating
+        it with attributes `fields` if it does not exist yet.
+        """
+        with interning:
+            table = Sentence.interned.get(cls)
+            if table is None:
+                table = Sentence.interned[cls] = dict()
+            sentence = table.get(key)
+            if sentence is None:
+                sentence = object.__new__(cls)
+                object.__setattr__(sentence, "_symbols", None)
+                for name, value in fields.items():
+                    object.__setattr__(sentence, name, value)
+                table[key] = sentence
+                Sentence.size += 1
+                if Sentence.size >= Sentence.sweep_at:
+                    Sentence.sweep()
+            return sentence
+
+    @staticmethod
+    def sweep():
+        """
+        Removes from the intern tables every sentence that only they
+        refer to, directly or through other such sentences.
+        """
+        with interning:
+            # What getrefcount reports for a value only its table refers to
+            probe = {None: object()}
+            unreferenced = sys.getrefcount(probe[None])
+            removed = True
+            while removed:
+                removed = False
+                for table in Sentence.interned.values():
+                    # Newest first, so a sentence goes before its parts
+                    for key in reversed(list(table)):
+                        if sys.getrefcount(table[key]) <= unreferenced:
+                            del table[key]
+                            removed = True
+            Sentence.size = sum(len(table)
+                                for table in Sentence.interned.values())
+            Sentence.sweep_at = max(1024, 2 * Sentence.size)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("logical sentences are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("logical sentences are immutable")
+
+    def __reduce__(self):
+        # Unpickling and copying construct the sentence again, and so
+        # find the interned one
+        return (type(self), self.arguments())
+
+    def arguments(self):
+        """Returns the arguments the logical sentence is constructed from."""
+        return ()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may assign only
+        some of its symbols, returning True or False if that decides it
+        and None otherwise.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """
+        Returns a frozenset of all symbols in the logical sentence,
+        found on the first call and cached.
+        """
+        if getattr(self, "_symbols", None) is None:
+            object.__setattr__(self, "_symbols", self.find_symbols())
+        return self._symbols
+
+    def find_symbols(self):
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return frozenset()
 
     @classmethod
     def validate(cls, sentence):
@@ -43,69 +156,68 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __new__(cls, name):
+        return cls.intern(name, name=name)
 
     def __repr__(self):
         return self.name
 
+    def arguments(self):
+        return (self.name,)
+
     def evaluate(self, model):
         try:
             return bool(model[self.name])
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def find_symbols(self):
+        return frozenset([self.name])
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern(operand, operand=operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def arguments(self):
+        return (self.operand,)
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def partial(self, model):
+        value = self.operand.partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
+    def find_symbols(self):
         return self.operand.symbols()
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return cls.intern(conjuncts, conjuncts=conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,151 +225,305 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def arguments(self):
+        return self.conjuncts
+
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """
+        Sentences are immutable, so a conjunction cannot be added to;
+        raises TypeError rather than leave `conjunct` silently out.
+        """
+        raise TypeError("sentences are immutable; "
+                        "use And(*knowledge.conjuncts, conjunct)")
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return cls.intern(disjuncts, disjuncts=disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def arguments(self):
+        return self.disjuncts
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return cls.intern((antecedent, consequent),
+                          antecedent=antecedent, consequent=consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def partial(self, model):
+        antecedent = self.antecedent.partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def find_symbols(self):
+        return self.antecedent.symbols() | self.consequent.symbols()
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return cls.intern((left, right), left=left, right=right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def arguments(self):
+        return (self.left, self.right)
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def partial(self, model):
+        left = self.left.partial(model)
+        if left is None:
+            return None
+        right = self.right.partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def find_symbols(self):
+        return self.left.symbols() | self.right.symbols()
+
+
+def symbol_counts(sentence, counts=None):
+    """
+    Returns a dict mapping the name of every symbol in the logical
+    sentence to the number of times it occurs there, adding to `counts`
+    if given.
+    """
+    if counts is None:
+        counts = dict()
+    if isinstance(sentence, Symbol):
+        counts[sentence.name] = counts.get(sentence.name, 0) + 1
+    elif isinstance(sentence, Not):
+        symbol_counts(sentence.operand, counts)
+    elif isinstance(sentence, And):
+        for conjunct in sentence.conjuncts:
+            symbol_counts(conjunct, counts)
+    elif isinstance(sentence, Or):
+        for disjunct in sentence.disjuncts:
+            symbol_counts(disjunct, counts)
+    elif isinstance(sentence, Implication):
+        symbol_counts(sentence.antecedent, counts)
+        symbol_counts(sentence.consequent, counts)
+    elif isinstance(sentence, Biconditional):
+        symbol_counts(sentence.left, counts)
+        symbol_counts(sentence.right, counts)
+    return counts
+
+
+def model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query.
+
+    Symbols are assigned most frequent first, and a branch of the search
+    ends as soon as the partial model makes the knowledge base false or
+    the query true, without assigning the remaining symbols.
+
+    If `stats` is a dict, stats["models"] is increased by the number of
+    models, complete or partial, at which the search ended a branch.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("models", 0)
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+        # If knowledge base is false in every extension of the model,
+        # or query is true in every one, entailment holds there
+        known = knowledge.partial(model)
+        if known is False:
+            stats["models"] += 1
+            return True
+        queried = query.partial(model)
+        if queried is True:
+            stats["models"] += 1
             return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+        # If knowledge base is true but query is false, it is not entailed
+        if known is True and queried is False:
+            stats["models"] += 1
+            return False
+
+        # Choose the next unused symbol, and ensure entailment holds
+        # both where it is true and where it is false
+        p = symbols[len(model)]
+        model[p] = True
+        entailed = check_all(knowledge, query, symbols, model)
+        if entailed:
+            model[p] = False
+            entailed = check_all(knowledge, query, symbols, model)
+        del model[p]
+        return entailed
+
+    # Get all symbols in both knowledge and query, most frequent first
+    counts = symbol_counts(query, symbol_counts(knowledge))
+    symbols = sorted(counts, key=lambda name: (-counts[name], name))
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def entailments(knowledge, queries):
+    """
+    Enumerates the models of the knowledge base once and returns, for each
+    of `queries` in order, ENTAILED if it is true in every model,
+    CONTRADICTED if it is false in every model and UNDETERMINED otherwise.
+    If the knowledge base has no models every query is ENTAILED, as with
+    `model_check`.
+    """
+    # Whether each query is true, and false, in some model found so far
+    can_be_true = [False] * len(queries)
+    can_be_false = [False] * len(queries)
+    undetermined = 0
+
+    def check_all(symbols, model):
+        """
+        Records the truth of every query in each model of the knowledge
+        base extending `model`, returning False once all are undetermined.
+        """
+        nonlocal undetermined
+        known = knowledge.partial(model)
+        if known is False:
+            return True
+        if known is True:
+            # Every extension of the model is a model of the knowledge
+            # base; record the queries it decides, and collect the
+            # symbols of those it leaves open, which may still be
+            # decided the same way in every extension
+            pending = set()
+            for i, query in enumerate(queries):
+                if can_be_true[i] and can_be_false[i]:
+                    continue
+                value = query.partial(model)
+                if value is None:
+                    pending |= query.symbols()
+                elif value and not can_be_true[i]:
+                    can_be_true[i] = True
+                    undetermined += can_be_false[i]
+                elif not value and not can_be_false[i]:
+                    can_be_false[i] = True
+                    undetermined += can_be_true[i]
+            if undetermined == len(queries):
+                return False
+            if not pending:
+                return True
+            # Assign only the symbols of the open queries
+            p = next(name for name in symbols
+                     if name in pending and name not in model)
+        else:
+            p = symbols[len(model)]
+        model[p] = True
+        searching = check_all(symbols, model)
+        if searching:
+            model[p] = False
+            searching = check_all(symbols, model)
+        del model[p]
+        return searching
+
+    counts = symbol_counts(knowledge)
+    for query in queries:
+        symbol_counts(query, counts)
+    symbols = sorted(counts, key=lambda name: (-counts[name], name))
+    check_all(symbols, dict())
+
+    return [
+        UNDETERMINED if can_be_true[i] and can_be_false[i]
+        else CONTRADICTED if can_be_false[i]
+        else ENTAILED
+        for i in range(len(queries))
+    ]
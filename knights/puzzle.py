@@ -76,8 +76,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            answers = entailments(knowledge, symbols)
+            for symbol, answer in zip(symbols, answers):
+                if answer == ENTAILED:
                     print(f"    {symbol}")
 
 
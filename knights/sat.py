@@ -0,0 +1,324 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from logical sentences by
+    the Tseitin encoding: every compound subsentence gets a variable of
+    its own, constrained to be equivalent to it, so the clauses grow
+    linearly with the sentence instead of exponentially.
+
+    Variables are numbered from 1 and literals are nonzero integers,
+    negative for negated variables.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+        # Maps symbol names to their variables
+        self.variables = dict()
+        # Maps every sentence encoded so far to its literal, so repeated
+        # subsentences share one variable
+        self.literals = dict()
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of the symbol called `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses requiring `sentence` to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when `sentence` is,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            v = self.new_variable()
+            # v => every part, and all parts => v
+            for part in parts:
+                self.clauses.append([-v, part])
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            v = self.new_variable()
+            # v => some part, and any part => v
+            self.clauses.append([-v] + parts)
+            for part in parts:
+                self.clauses.append([v, -part])
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Unit propagation watches two literals of every clause, conflicts are
+    analyzed to their first unique implication point to learn a clause
+    and backjump, and decisions pick the variable most involved in
+    recent conflicts, in the polarity it last had.
+
+    Internally literal +v is 2 * v and literal -v is 2 * v + 1, so a
+    literal's negation is `lit ^ 1` and its variable is `lit >> 1`.
+    """
+
+    def __init__(self, count, clauses):
+        self.count = count
+        # value[lit] is 1 if lit is true, -1 if false and 0 if unassigned
+        self.value = [0] * (2 * count + 2)
+        self.level = [0] * (count + 1)
+        self.reason = [None] * (count + 1)
+        self.phase = [1] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.bump = 1.0
+        self.trail = []
+        # Where on the trail each decision level starts
+        self.limits = []
+        self.head = 0
+        # watches[lit] holds the clauses watching lit, to be visited
+        # when lit becomes false
+        self.watches = [[] for _ in range(2 * count + 2)]
+        self.conflicts = 0
+        self.decisions = 0
+        self.unsatisfiable = False
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """Adds a clause of signed integer literals before solving."""
+        literals = []
+        for literal in clause:
+            lit = 2 * literal if literal > 0 else -2 * literal + 1
+            if lit ^ 1 in literals:
+                # Always true
+                return
+            if lit not in literals:
+                literals.append(lit)
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            if self.value[literals[0]] == -1:
+                self.unsatisfiable = True
+            elif self.value[literals[0]] == 0:
+                self.assign(literals[0], None)
+        else:
+            self.watches[literals[0]].append(literals)
+            self.watches[literals[1]].append(literals)
+
+    def assign(self, lit, reason):
+        self.value[lit] = 1
+        self.value[lit ^ 1] = -1
+        v = lit >> 1
+        self.level[v] = len(self.limits)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning a clause
+        made false by the assignment, or None if there is no conflict.
+        """
+        value = self.value
+        while self.head < len(self.trail):
+            false_lit = self.trail[self.head] ^ 1
+            self.head += 1
+            watchers = self.watches[false_lit]
+            kept = []
+            for i, clause in enumerate(watchers):
+                # Keep the falsified watch in clause[1]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if value[clause[0]] == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if value[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value[clause[0]] == -1:
+                        kept.extend(watchers[i + 1:])
+                        self.watches[false_lit] = kept
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[false_lit] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from `conflict`, asserting its first
+        literal, and the decision level to backjump to.
+        """
+        current = len(self.limits)
+        seen = [False] * (self.count + 1)
+        learned = [None]
+        pending = 0
+        lit = None
+        clause = conflict
+        index = len(self.trail) - 1
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                v = q >> 1
+                if not seen[v] and self.level[v] > 0:
+                    seen[v] = True
+                    self.bump_activity(v)
+                    if self.level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(q)
+            # Resolve on the latest literal of this level in the clause
+            while not seen[self.trail[index] >> 1]:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            clause = self.reason[lit >> 1]
+            seen[lit >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = lit ^ 1
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal assigned last after the asserting one
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.level[learned[i] >> 1])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.level[learned[1] >> 1]
+
+    def bump_activity(self, v):
+        self.activity[v] += self.bump
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+
+    def backtrack(self, level):
+        """Undoes every assignment made above decision `level`."""
+        if len(self.limits) <= level:
+            return
+        limit = self.limits[level]
+        for lit in self.trail[limit:]:
+            v = lit >> 1
+            self.phase[v] = 1 if lit & 1 == 0 else -1
+            self.value[lit] = 0
+            self.value[lit ^ 1] = 0
+            self.reason[v] = None
+        del self.trail[limit:]
+        del self.limits[level:]
+        self.head = limit
+
+    def decide(self):
+        """
+        Returns the literal to try next, or None if every variable is
+        assigned.
+        """
+        best = None
+        for v in range(1, self.count + 1):
+            if self.value[2 * v] == 0 and (
+                    best is None or self.activity[v] > self.activity[best]):
+                best = v
+        if best is None:
+            return None
+        return 2 * best if self.phase[best] == 1 else 2 * best + 1
+
+    def solve(self):
+        """
+        Returns True if the clauses are satisfiable, leaving a satisfying
+        assignment in place, and False otherwise.
+        """
+        if self.unsatisfiable:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watches[learned[0]].append(learned)
+                    self.watches[learned[1]].append(learned)
+                    self.assign(learned[0], learned)
+                self.bump /= 0.95
+            else:
+                lit = self.decide()
+                if lit is None:
+                    return True
+                self.decisions += 1
+                self.limits.append(len(self.trail))
+                self.assign(lit, None)
+
+    def model(self):
+        """Returns the truth value of every variable, indexed from 1."""
+        return [None] + [self.value[2 * v] == 1
+                         for v in range(1, self.count + 1)]
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence`, as a dict from symbol names to truth
+    values, or None if it has none.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf.count, cnf.clauses)
+    if not solver.solve():
+        return None
+    values = solver.model()
+    return {name: values[v] for name, v in cnf.variables.items()}
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that knowledge
+    and the negation of query cannot both be true.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.clauses.append([-cnf.literal(query)])
+    return not Solver(cnf.count, cnf.clauses).solve()
@@ -0,0 +1,83 @@
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Models are numbered so that symbol i is true in model m if bit i of m is
+# set, and 64 consecutive models are packed into the bits of one word
+WORD_BITS = 6
+ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+ZEROS = np.uint64(0)
+
+# The truth table column of each of the first 6 symbols within one word
+WORD_COLUMNS = [np.uint64(mask) for mask in [
+    0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000,
+]]
+
+
+def columns(count, block, chunk):
+    """
+    Returns the truth table columns of `count` symbols over the 2 ** block
+    models of chunk number `chunk`, as arrays of packed words, or as one
+    word when a symbol has the same value throughout the chunk.
+    """
+    words = np.arange(1 << (block - WORD_BITS), dtype=np.uint64)
+    result = []
+    for i in range(count):
+        if i < WORD_BITS:
+            result.append(WORD_COLUMNS[i])
+        elif i < block:
+            bit = (words >> np.uint64(i - WORD_BITS)) & np.uint64(1)
+            result.append(np.where(bit == 1, ONES, ZEROS))
+        else:
+            result.append(ONES if chunk >> (i - block) & 1 else ZEROS)
+    return result
+
+
+def evaluate(sentence, index, table):
+    """
+    Returns the packed truth values of `sentence` over a chunk of models,
+    given the column table[index[name]] of every symbol.
+    """
+    if isinstance(sentence, Symbol):
+        return table[index[sentence.name]]
+    if isinstance(sentence, Not):
+        return ~evaluate(sentence.operand, index, table)
+    if isinstance(sentence, And):
+        result = ONES
+        for conjunct in sentence.conjuncts:
+            result = result & evaluate(conjunct, index, table)
+        return result
+    if isinstance(sentence, Or):
+        result = ZEROS
+        for disjunct in sentence.disjuncts:
+            result = result | evaluate(disjunct, index, table)
+        return result
+    if isinstance(sentence, Implication):
+        return (~evaluate(sentence.antecedent, index, table)
+                | evaluate(sentence.consequent, index, table))
+    if isinstance(sentence, Biconditional):
+        return ~(evaluate(sentence.left, index, table)
+                 ^ evaluate(sentence.right, index, table))
+    raise TypeError(f"cannot evaluate {sentence!r}")
+
+
+def model_check(knowledge, query, block=20):
+    """
+    Checks if knowledge base entails query, evaluating both over
+    2 ** block models at a time with bitwise operations on packed
+    truth table columns.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    index = {name: i for i, name in enumerate(symbols)}
+    # Enumerate at least one whole word of models; symbols beyond
+    # the real ones are never looked at
+    count = max(len(symbols), WORD_BITS)
+    block = max(WORD_BITS, min(block, count))
+    for chunk in range(1 << (count - block)):
+        table = columns(len(symbols), block, chunk)
+        knowledge_true = evaluate(knowledge, index, table)
+        query_false = ~evaluate(query, index, table)
+        if np.any(knowledge_true & query_false):
+            return False
+    return True
@@ -0,0 +1,110 @@
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import random
+import time
+
+import nim
+from dense import BATCH, DenseNimAI, train_batch
+from oracle import agreement, optimal_policy
+
+
+def converge(trainer, alpha, epsilon, decay, policy, target, step, limit,
+             initial, seed, batch=BATCH):
+    """
+    Trains a new AI with `trainer` ("batch" or "sequential") `step` games
+    at a time until it agrees with `policy` on at least `target` of the
+    winnable states or has played `limit` games. The batch trainer plays
+    `batch` games at a time, and epsilon is multiplied by `decay` after
+    every `step` games.
+
+    Returns the games played, the training seconds (not counting the
+    agreement checks) and the agreement reached.
+    """
+    ai = DenseNimAI(alpha, epsilon, initial)
+    # The sequential trainer explores with the random module
+    random.seed(seed)
+    elapsed = 0
+    score = agreement(ai, policy)
+    while score < target and ai.games < limit:
+        start = time.perf_counter()
+        if trainer == "batch":
+            train_batch(step, batch, initial=initial, seed=seed + ai.games,
+                        progress=False, ai=ai)
+        else:
+            # nim.train prints a line per game
+            with contextlib.redirect_stdout(io.StringIO()):
+                nim.train(step, ai, initial)
+            ai.games += step
+        ai.epsilon *= decay
+        elapsed += time.perf_counter() - start
+        score = agreement(ai, policy)
+    return ai.games, elapsed, score
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how much training each Nim trainer "
+                    "configuration needs to match perfect play."
+    )
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7])
+    parser.add_argument("--trainers", nargs="+",
+                        choices=["batch", "sequential"],
+                        default=["batch", "sequential"])
+    parser.add_argument("--alphas", type=float, nargs="+",
+                        default=[0.3, 0.5, 0.8])
+    parser.add_argument("--epsilons", type=float, nargs="+",
+                        default=[0.1, 0.3])
+    parser.add_argument("--decays", type=float, nargs="+",
+                        default=[1.0, 0.9],
+                        help="factors applied to epsilon after every "
+                             "--step games")
+    parser.add_argument("--target", type=float, default=0.95,
+                        help="fraction of winnable states where the AI "
+                             "must choose a winning action")
+    parser.add_argument("--step", type=int, default=4096,
+                        help="games between agreement checks")
+    parser.add_argument("--batch", type=int, default=BATCH,
+                        help="games the batch trainer plays in lockstep")
+    parser.add_argument("--limit", type=int, default=500000,
+                        help="give up after this many games")
+    parser.add_argument("--sequential-limit", type=int, default=50000,
+                        help="give up on the sequential trainer after "
+                             "this many games")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="CSV file to write the table to")
+    args = parser.parse_args()
+
+    policy = optimal_policy(args.piles)
+    print(f"{len(policy)} winnable states from {args.piles}.")
+
+    rows = []
+    print(f"{'trainer':<12}{'alpha':>7}{'epsilon':>9}{'decay':>7}"
+          f"{'games':>10}{'seconds':>10}{'agreement':>11}")
+    for trainer, alpha, epsilon, decay in itertools.product(
+            args.trainers, args.alphas, args.epsilons, args.decays):
+        limit = args.limit if trainer == "batch" else args.sequential_limit
+        games, elapsed, score = converge(
+            trainer, alpha, epsilon, decay, policy, args.target, args.step,
+            limit, args.piles, args.seed, args.batch
+        )
+        reached = score >= args.target
+        rows.append([trainer, alpha, epsilon, decay,
+                     games if reached else "", f"{elapsed:.3f}",
+                     f"{score:.4f}"])
+        print(f"{trainer:<12}{alpha:>7}{epsilon:>9}{decay:>7}"
+              f"{games if reached else '-':>10}{elapsed:>10.2f}"
+              f"{score:>11.1%}")
+
+    if args.output is not None:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["trainer", "alpha", "epsilon", "decay",
+                             "games", "seconds", "agreement"])
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from nim import NimAI
+
+MAGIC = b"NIMQTAB\0"
+VERSION = 2
+
+# magic, version, alpha, epsilon, games trained, number of piles, followed
+# by the initial size of each pile
+HEADER = struct.Struct("<8sIddqI")
+PILE = struct.Struct("<I")
+
+# Games `train_batch` plays in lockstep by default. Larger batches train
+# faster per game but learn less from each: from 10000 games on the
+# standard piles, 16 agrees with perfect play about as often as one game
+# at a time, while 256 falls to about two thirds and 4096 to under a third
+BATCH = 16
+
+
+class StateSpace():
+    """
+    Numbers every pile state reachable from `initial` and every action,
+    so Q-values can live in a dense (state, slot) array.
+
+    A state is encoded in mixed radix, with pile i a digit in base
+    initial[i] + 1. Action (i, j) takes slot offsets[i] + j - 1.
+    """
+
+    def __init__(self, initial=[1, 3, 5, 7]):
+        self.initial = tuple(initial)
+        self.strides = []
+        stride = 1
+        for pile in reversed(self.initial):
+            self.strides.insert(0, stride)
+            stride *= pile + 1
+        self.size = stride
+
+        self.offsets = []
+        slots = 0
+        for pile in self.initial:
+            self.offsets.append(slots)
+            slots += pile
+        self.slots = slots
+        self.slot_piles = np.repeat(np.arange(len(self.initial)),
+                                    self.initial)
+        self.slot_counts = np.concatenate(
+            [np.arange(1, pile + 1) for pile in self.initial]
+        )
+        # Taking slot a lowers the state number by deltas[a]
+        self.deltas = (np.array(self.strides)[self.slot_piles]
+                       * self.slot_counts)
+
+        # piles[s] is the state numbered s, and legal[s, a] whether
+        # slot a is an available action in it
+        self.piles = self.decode(np.arange(self.size))
+        self.legal = (self.piles[:, self.slot_piles]
+                      >= self.slot_counts[np.newaxis, :])
+
+    def encode(self, piles):
+        """
+        Returns the number of the state `piles`, or an array of numbers
+        if `piles` is a NumPy array with one state per row.
+        """
+        if isinstance(piles, np.ndarray):
+            return piles @ np.array(self.strides)
+        return sum(pile * stride for pile, stride in zip(piles, self.strides))
+
+    def decode(self, index):
+        """
+        Returns the piles of state number `index` as an array,
+        with one row per state if `index` is an array.
+        """
+        index = np.asarray(index)[..., np.newaxis]
+        return index // self.strides % (np.array(self.initial) + 1)
+
+    def slot(self, action):
+        """Returns the slot of action `(i, j)`."""
+        i, j = action
+        return self.offsets[i] + j - 1
+
+    def action(self, slot):
+        """Returns the action `(i, j)` that takes `slot`."""
+        return (int(self.slot_piles[slot]), int(self.slot_counts[slot]))
+
+
+class DenseNimAI(NimAI):
+    """
+    NimAI whose Q-values live in a dense float array indexed by
+    (state number, action slot) of a StateSpace, instead of a dictionary.
+    """
+
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7]):
+        super().__init__(alpha, epsilon)
+        self.space = StateSpace(initial)
+        # q[s, a] is the Q-value of slot a in state number s, and
+        # visits[s, a] how many times it was updated
+        self.q = np.zeros((self.space.size, self.space.slots))
+        self.visits = np.zeros(self.q.shape, dtype=np.uint32)
+        # Number of self-play games trained on by `train_batch`
+        self.games = 0
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Returns the DenseNimAI saved in `filename`, or None if there is
+        none or it was written by an incompatible version.
+
+        The Q-table is memory-mapped copy-on-write, so loading is
+        immediate and further training never changes the file.
+        """
+        try:
+            with open(filename, "rb") as f:
+                header = f.read(HEADER.size)
+                magic, version, alpha, epsilon, games, count = \
+                    HEADER.unpack(header)
+                if magic != MAGIC or version != VERSION:
+                    return None
+                initial = [PILE.unpack(f.read(PILE.size))[0]
+                           for _ in range(count)]
+        except (OSError, struct.error):
+            return None
+
+        ai = cls(alpha, epsilon, initial)
+        ai.games = games
+        offset = table_offset(count)
+        shape = ai.q.shape
+        try:
+            ai.q = np.memmap(filename, dtype="<f8", mode="c",
+                             offset=offset, shape=shape)
+            ai.visits = np.memmap(filename, dtype="<u4", mode="c",
+                                   offset=offset + ai.q.nbytes, shape=shape)
+        except (OSError, ValueError):
+            return None
+        return ai
+
+    def save(self, filename):
+        """Writes this AI to `filename`, replacing any previous file."""
+        count = len(self.space.initial)
+        header = HEADER.pack(MAGIC, VERSION, self.alpha, self.epsilon,
+                             self.games, count)
+        header += b"".join(PILE.pack(pile) for pile in self.space.initial)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(header)
+            # Keep the Q-table 8-byte aligned for mapping
+            f.write(b"\0" * (table_offset(count) - len(header)))
+            f.write(self.q.astype("<f8").tobytes())
+            f.write(self.visits.astype("<u4").tobytes())
+        os.replace(temporary, filename)
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state `state` and the action `action`.
+        """
+        return float(self.q[self.space.encode(state), self.space.slot(action)])
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state `state` and the action `action`
+        as `NimAI.update_q_value` does.
+        """
+        s = self.space.encode(state)
+        a = self.space.slot(action)
+        self.q[s, a] = old_q + self.alpha * ((reward + future_rewards) - old_q)
+        self.visits[s, a] += 1
+
+    def best_future_reward(self, state):
+        """
+        Return the highest Q-value of any action available in `state`,
+        or 0 if there are none.
+        """
+        s = self.space.encode(state)
+        legal = self.space.legal[s]
+        if not legal.any():
+            return 0
+        return float(self.q[s][legal].max())
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Return an action `(i, j)` to take in `state`: with probability
+        `self.epsilon` a random one if `epsilon` is True, and otherwise
+        the first with the highest Q-value.
+        """
+        s = self.space.encode(state)
+        legal = self.space.legal[s]
+        if epsilon and random.random() <= self.epsilon:
+            return self.space.action(random.choice(np.flatnonzero(legal)))
+        return self.space.action(np.where(legal, self.q[s], -np.inf).argmax())
+
+    def to_nim_ai(self):
+        """
+        Returns a NimAI holding every Q-value this AI has updated
+        in its usual dictionary.
+        """
+        ai = NimAI(self.alpha, self.epsilon)
+        for s, a in zip(*np.nonzero(self.visits)):
+            state = tuple(int(pile) for pile in self.space.piles[s])
+            ai.q[state, self.space.action(a)] = float(self.q[s, a])
+        return ai
+
+
+def table_offset(count):
+    """
+    Returns where the Q-table starts in a file saved with `count` piles.
+    """
+    size = HEADER.size + count * PILE.size
+    return size + -size % 8
+
+
+def train_batch(n, batch=BATCH, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7],
+                seed=None, progress=True, ai=None, decay=1.0):
+    """
+    Train a DenseNimAI by playing `n` games against itself, `batch` games
+    at a time in lockstep, with the same updates `nim.train` makes.
+    `ai` can be set to an AI to keep training, in which case its own
+    alpha, epsilon and piles are used.
+
+    After every batch the AI's epsilon is multiplied by `decay`.
+
+    Games in a batch move simultaneously, choosing moves from the table
+    as it was before the step, and when two of them update the same
+    (state, action) pair in the same step only one update is kept. The
+    larger the batch, the more games it takes to learn the same policy.
+    """
+    if ai is None:
+        ai = DenseNimAI(alpha, epsilon, initial)
+    alpha = ai.alpha
+    space = ai.space
+    q = ai.q
+    visits = ai.visits
+    rng = np.random.default_rng(seed)
+    start_state = space.encode(space.initial)
+
+    played = 0
+    reported = 0
+    while played < n:
+        size = min(batch, n - played)
+        lanes = np.arange(size)
+        state = np.full(size, start_state)
+        player = np.zeros(size, dtype=np.int64)
+        # last_state[g, p] and last_slot[g, p] are the last move player p
+        # made in game g, with -1 before their first move
+        last_state = np.full((size, 2), -1)
+        last_slot = np.full((size, 2), -1)
+        active = np.ones(size, dtype=bool)
+
+        while active.any():
+            g = lanes[active]
+            s = state[g]
+            legal = space.legal[s]
+
+            # Epsilon-greedy: explore with a random legal slot, otherwise
+            # take the first slot with the highest Q-value
+            values = np.where(legal, q[s], -np.inf)
+            greedy = values.argmax(axis=1)
+            noise = np.where(legal, rng.random(legal.shape), -1)
+            explore = rng.random(len(g)) <= ai.epsilon
+            a = np.where(explore, noise.argmax(axis=1), greedy)
+
+            p = player[g]
+            last_state[g, p] = s
+            last_slot[g, p] = a
+            new = s - space.deltas[a]
+            state[g] = new
+            player[g] = 1 - p
+
+            over = new == 0
+            future = np.where(space.legal[new], q[new], -np.inf).max(axis=1)
+            future[over] = 0
+
+            # The mover who took the last object loses
+            learn(q, visits, s[over], a[over], -1, future[over], alpha)
+
+            # Their opponent's last move is rewarded if the game is over,
+            # and otherwise updated towards the new state's value
+            opponent = 1 - p
+            their_state = last_state[g, opponent]
+            their_slot = last_slot[g, opponent]
+            moved = their_state != -1
+            learn(q, visits, their_state[moved], their_slot[moved],
+                  over[moved].astype(float), future[moved], alpha)
+
+            active[g[over]] = False
+
+        played += size
+        ai.games += size
+        ai.epsilon *= decay
+        if progress and played * 10 // n > reported:
+            reported = played * 10 // n
+            print(f"Played {played} of {n} training games")
+
+    return ai
+
+
+def learn(q, visits, s, a, reward, future, alpha):
+    """
+    Moves q[s, a] towards reward + future for every (s, a) pair,
+    as `NimAI.update_q_value` does for one.
+    """
+    old = q[s, a]
+    q[s, a] = old + alpha * ((reward + future) - old)
+    np.add.at(visits, (s, a), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a Nim AI on many self-play games at once."
+    )
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=BATCH,
+                        help="number of games played in lockstep; larger "
+                             "batches are faster but learn less per game")
+    parser.add_argument("--alpha", type=float, default=0.5)
+    parser.add_argument("--epsilon", type=float, default=0.1)
+    parser.add_argument("--decay", type=float, default=1.0,
+                        help="factor applied to epsilon after every batch")
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7])
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--model",
+                        help="file to save the trained AI to; training "
+                             "resumes from it if it already exists")
+    args = parser.parse_args()
+
+    ai = None
+    if args.model is not None:
+        ai = DenseNimAI.load(args.model)
+        if ai is not None:
+            print(f"Resuming from {args.model} after {ai.games} games.")
+
+    start = time.perf_counter()
+    ai = train_batch(args.games, args.batch, args.alpha, args.epsilon,
+                     args.piles, args.seed, ai=ai, decay=args.decay)
+    elapsed = time.perf_counter() - start
+    print(f"Done training: {args.games} games in {elapsed:.2f}s "
+          f"({args.games / elapsed:.0f} games/sec), "
+          f"{np.count_nonzero(ai.visits)} Q-values learned.")
+    if args.model is not None:
+        ai.save(args.model)
+
+
+if __name__ == "__main__":
+    main()
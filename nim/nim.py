@@ -177,17 +177,29 @@ class NimAI():
         return best_action
 
 
-def train(n):
+def train(n, ai=None, initial=None):
     """
     Train an AI by playing `n` games against itself.
+    `ai` can be set to an AI to keep training, such as a
+    `dense.DenseNimAI`; by default a new NimAI is trained.
+    Games start from the piles `initial`, by default those of a
+    `dense.DenseNimAI` or else [1, 3, 5, 7].
     """
 
-    player = NimAI()
+    player = NimAI() if ai is None else ai
+
+    # A DenseNimAI only has Q-values for states of its own piles
+    space = getattr(player, "space", None)
+    if initial is None:
+        initial = [1, 3, 5, 7] if space is None else list(space.initial)
+    elif space is not None and tuple(initial) != space.initial:
+        raise ValueError(f"AI was made for piles {list(space.initial)}, "
+                         f"not {initial}")
 
     # Play n games
     for i in range(n):
         print(f"Playing training game {i + 1}")
-        game = Nim()
+        game = Nim(initial)
 
         # Keep track of last move made by either player
         last = {
@@ -0,0 +1,97 @@
+import itertools
+import random
+from functools import reduce
+from operator import xor
+
+from nim import Nim
+
+
+def winning_actions(piles):
+    """
+    Returns every action `(i, j)` that wins Nim from `piles` with perfect
+    play, where the player who takes the last object loses. The list is
+    empty if the player to move loses against a perfect opponent.
+    """
+    big = sum(1 for pile in piles if pile > 1)
+    if big == 0:
+        # Only single objects are left: win by leaving an odd number
+        ones = sum(piles)
+        return [] if ones % 2 else [
+            (i, 1) for i, pile in enumerate(piles) if pile
+        ]
+
+    actions = []
+    nim_sum = reduce(xor, piles, 0)
+    for i, pile in enumerate(piles):
+        if big == 1 and pile > 1:
+            # Taking the last big pile down to 0 or 1, leave an odd
+            # number of single objects for the opponent
+            ones = sum(1 for p in piles if p == 1)
+            actions.append((i, pile) if ones % 2 else (i, pile - 1))
+        elif big > 1 and pile ^ nim_sum < pile:
+            # Otherwise play as in normal Nim, leaving a nim-sum of zero
+            actions.append((i, pile - (pile ^ nim_sum)))
+    return actions
+
+
+def optimal_action(piles, rng=random):
+    """
+    Returns a random winning action from `piles`, or a random action
+    if there is none.
+    """
+    actions = winning_actions(piles)
+    if not actions:
+        actions = sorted(Nim.available_actions(piles))
+    return rng.choice(actions)
+
+
+def win_rate(ai, games=1000, initial=[1, 3, 5, 7], seed=None):
+    """
+    Plays `ai` without exploration against the nim-sum strategy for
+    `games` games, alternating who moves first, and returns
+    (wins, winnable): the fraction of games the AI won, and the fraction
+    a perfect player would have won in its place.
+    """
+    rng = random.Random(seed)
+    wins = 0
+    winnable = 0
+    for i in range(games):
+        game = Nim(initial)
+        ai_player = i % 2
+        if game.player == ai_player:
+            winnable += bool(winning_actions(game.piles))
+        else:
+            winnable += not winning_actions(game.piles)
+        while game.winner is None:
+            if game.player == ai_player:
+                action = ai.choose_action(game.piles, epsilon=False)
+            else:
+                action = optimal_action(game.piles, rng)
+            game.move(action)
+        wins += game.winner == ai_player
+    return wins / games, winnable / games
+
+
+def optimal_policy(initial=[1, 3, 5, 7]):
+    """
+    Returns a dict mapping every state reachable from `initial` that
+    has a winning action, as a tuple of piles, to the set of its
+    winning actions.
+    """
+    policy = dict()
+    for piles in itertools.product(*(range(pile + 1) for pile in initial)):
+        actions = winning_actions(piles)
+        if actions:
+            policy[piles] = set(actions)
+    return policy
+
+
+def agreement(ai, policy):
+    """
+    Returns the fraction of the winnable states in `policy` where `ai`,
+    without exploration, chooses a winning action.
+    """
+    agreed = 0
+    for piles, actions in policy.items():
+        agreed += ai.choose_action(list(piles), epsilon=False) in actions
+    return agreed / len(policy)
@@ -0,0 +1,103 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from dense import BATCH, DenseNimAI, train_batch
+from oracle import win_rate
+
+MERGES = ["average", "visits"]
+
+
+def train_worker(task):
+    """
+    Trains one DenseNimAI from scratch on its own seed and epsilon,
+    returning its Q-table and visit counts.
+    """
+    games, batch, alpha, epsilon, initial, seed = task
+    ai = train_batch(games, batch, alpha, epsilon, initial, seed,
+                     progress=False)
+    return np.asarray(ai.q), np.asarray(ai.visits)
+
+
+def merge(tables, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7],
+          weighting="visits"):
+    """
+    Returns a DenseNimAI combining the (q, visits) `tables` trained by
+    independent workers.
+
+    With "average" weighting each Q-value is the mean over the workers
+    that updated it; with "visits" weighting every worker counts in
+    proportion to how often it updated it. Q-values no worker updated
+    stay 0.
+    """
+    if weighting not in MERGES:
+        raise ValueError(f"unknown weighting {weighting!r}")
+    ai = DenseNimAI(alpha, epsilon, initial)
+    total = np.zeros(ai.q.shape)
+    weights = np.zeros(ai.q.shape)
+    for q, visits in tables:
+        weight = visits if weighting == "visits" else visits > 0
+        total += q * weight
+        weights += weight
+        ai.visits += visits
+    np.divide(total, weights, out=ai.q, where=weights > 0)
+    return ai
+
+
+def train_parallel(workers, games, batch=BATCH, alpha=0.5, epsilons=[0.1],
+                   initial=[1, 3, 5, 7], seed=0, weighting="visits"):
+    """
+    Trains `workers` AIs on `games` self-play games each in a process
+    pool, worker i with seed `seed + i` and the i-th of `epsilons`
+    (repeated as needed), and returns their merged AI.
+    """
+    tasks = [(games, batch, alpha, epsilons[i % len(epsilons)], initial,
+              seed + i) for i in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        tables = pool.map(train_worker, tasks)
+    ai = merge(tables, alpha, epsilons[0], initial, weighting)
+    ai.games = workers * games
+    return ai
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train Nim AIs on several cores at once and measure "
+                    "how their merged play compares to perfect play."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="largest number of worker processes to try")
+    parser.add_argument("--games", type=int, default=8000,
+                        help="self-play games per worker")
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--alpha", type=float, default=0.5)
+    parser.add_argument("--epsilons", type=float, nargs="+",
+                        default=[0.05, 0.1, 0.2],
+                        help="exploration rates handed out to the workers "
+                             "in turn")
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7])
+    parser.add_argument("--evaluate", type=int, default=2000,
+                        help="games to play against the nim-sum strategy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'workers':<10}{'merge':<10}{'games':>10}{'seconds':>10}"
+          f"{'win rate':>10}{'perfect':>10}")
+    for workers in range(1, args.workers + 1):
+        for weighting in MERGES:
+            start = time.perf_counter()
+            ai = train_parallel(workers, args.games, args.batch, args.alpha,
+                                args.epsilons, args.piles, args.seed,
+                                weighting)
+            elapsed = time.perf_counter() - start
+            wins, winnable = win_rate(ai, args.evaluate, args.piles,
+                                      args.seed)
+            print(f"{workers:<10}{weighting:<10}{ai.games:>10}"
+                  f"{elapsed:>10.2f}{wins:>10.1%}{winnable:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
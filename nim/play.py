@@ -1,4 +1,23 @@
-from nim import train, play
+import argparse
 
-ai = train(1)
+from nim import play
+from dense import BATCH, DenseNimAI, train_batch
+
+parser = argparse.ArgumentParser(description="Play Nim against the AI.")
+parser.add_argument("--model", default="nim.model",
+                    help="trained AI to load, or to train and save "
+                         "if it does not exist yet")
+parser.add_argument("--train", type=int, default=0, metavar="GAMES",
+                    help="train for this many more games first")
+parser.add_argument("--batch", type=int, default=BATCH,
+                    help="number of training games played in lockstep")
+args = parser.parse_args()
+
+ai = DenseNimAI.load(args.model)
+if ai is None:
+    ai = train_batch(max(args.train, 10000), args.batch)
+    ai.save(args.model)
+elif args.train:
+    ai = train_batch(args.train, args.batch, ai=ai)
+    ai.save(args.model)
 play(ai)
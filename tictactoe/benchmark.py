@@ -0,0 +1,48 @@
+import argparse
+import time
+
+import tictactoe as ttt
+
+
+def measure(engine, board, cold=True):
+    """
+    Runs `minimax` once with `engine`, returning the action chosen, the
+    search statistics and the elapsed wall time.
+
+    If `cold` is True, the transposition table is emptied first.
+    """
+    if cold:
+        ttt.transpositions.clear()
+    ttt.search_stats["nodes"] = 0
+    ttt.search_stats["cutoffs"] = 0
+    start = time.perf_counter()
+    action = ttt.minimax(board, engine=engine)
+    elapsed = time.perf_counter() - start
+    return action, dict(ttt.search_stats), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare tic-tac-toe engines on the first move."
+    )
+    parser.parse_args()
+
+    board = ttt.initial_state()
+    runs = [
+        ("plain", "plain", True),
+        ("memo (cold)", "memo", True),
+        ("memo (warm)", "memo", False),
+        ("alphabeta", "alphabeta", True),
+        ("bitboard", "bitboard", True),
+        ("book", "book", True),
+    ]
+
+    print(f"{'engine':<16}{'action':>8}{'nodes':>10}{'cutoffs':>10}{'ms':>12}")
+    for name, engine, cold in runs:
+        action, stats, elapsed = measure(engine, board, cold)
+        print(f"{name:<16}{str(action):>8}{stats['nodes']:>10}"
+              f"{stats['cutoffs']:>10}{elapsed * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
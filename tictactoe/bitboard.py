@@ -0,0 +1,140 @@
+"""
+Bitboard Tic Tac Toe engine
+"""
+
+import math
+
+import tictactoe
+
+# Cell (i, j) is bit 3 * i + j of each player's mask
+FULL = 0b111111111
+
+CENTER = 1 << 4
+CORNERS = (1 << 0) | (1 << 2) | (1 << 6) | (1 << 8)
+EDGES = (1 << 1) | (1 << 3) | (1 << 5) | (1 << 7)
+
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+]
+
+# WINNING[mask] is True if a player holding the cells of `mask` has won
+WINNING = [
+    any(mask & win == win for win in WIN_MASKS) for mask in range(FULL + 1)
+]
+
+
+class BitBoard():
+    """
+    Board held as one 9-bit mask per player, changed in place by
+    `make` and `unmake` so a search allocates no new boards.
+    """
+
+    __slots__ = ("masks", "turn")
+
+    def __init__(self, x=0, o=0):
+        # masks[0] belongs to X and masks[1] to O; `turn` indexes the
+        # player to move
+        self.masks = [x, o]
+        self.turn = 0 if bin(x).count("1") == bin(o).count("1") else 1
+
+    @classmethod
+    def from_board(cls, board):
+        """Converts a list-of-lists board into a BitBoard."""
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == tictactoe.X:
+                    x |= 1 << (3 * i + j)
+                elif cell == tictactoe.O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_board(self):
+        """Converts the BitBoard back into a list-of-lists board."""
+        x, o = self.masks
+        return [
+            [
+                tictactoe.X if x >> (3 * i + j) & 1
+                else tictactoe.O if o >> (3 * i + j) & 1
+                else tictactoe.EMPTY
+                for j in range(3)
+            ]
+            for i in range(3)
+        ]
+
+    def empty(self):
+        """Returns the mask of empty cells."""
+        return FULL & ~(self.masks[0] | self.masks[1])
+
+    def moves(self):
+        """
+        Yields the bit of every empty cell: the center first,
+        then corners, then edges.
+        """
+        empty = self.empty()
+        for group in (empty & CENTER, empty & CORNERS, empty & EDGES):
+            while group:
+                bit = group & -group
+                group ^= bit
+                yield bit
+
+    def make(self, bit):
+        """Plays the cell `bit` for the player to move."""
+        self.masks[self.turn] |= bit
+        self.turn ^= 1
+
+    def unmake(self, bit):
+        """Takes back the move `bit`, which must have been the last made."""
+        self.turn ^= 1
+        self.masks[self.turn] ^= bit
+
+    def won(self):
+        """Returns True if the player who just moved has won."""
+        return WINNING[self.masks[self.turn ^ 1]]
+
+    def full(self):
+        """Returns True if no cell is empty."""
+        return self.masks[0] | self.masks[1] == FULL
+
+
+def negamax(board, alpha, beta):
+    """
+    Returns (value, bit) for the player to move on BitBoard `board`, where
+    value is 1 for a win, -1 for a loss and 0 for a draw, searching with
+    alpha-beta pruning. `board` is restored before returning.
+    """
+    tictactoe.search_stats["nodes"] += 1
+    if board.won():
+        return (-1, None)
+    if board.full():
+        return (0, None)
+
+    value = -math.inf
+    best = None
+    for bit in board.moves():
+        board.make(bit)
+        v = -negamax(board, -beta, -alpha)[0]
+        board.unmake(bit)
+        if v > value:
+            value = v
+            best = bit
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            tictactoe.search_stats["cutoffs"] += 1
+            break
+    return (value, best)
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player on the
+    list-of-lists board, or None if the game is over.
+    """
+    state = BitBoard.from_board(board)
+    _, bit = negamax(state, -math.inf, math.inf)
+    if bit is None:
+        return None
+    cell = bit.bit_length() - 1
+    return (cell // 3, cell % 3)
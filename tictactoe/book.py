@@ -0,0 +1,125 @@
+"""
+Tic Tac Toe opening book: every reachable position solved ahead of time
+"""
+
+import argparse
+import os
+import struct
+import time
+
+import tictactoe
+
+MAGIC = b"TTTBOOK\0"
+VERSION = 1
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "tictactoe.book")
+
+# magic, version
+HEADER = struct.Struct("<8sI")
+
+# The book holds one byte per canonical key (a base-3 board encoding):
+# (value + 1) << 4 | canonical action index, or MISSING if the position
+# cannot arise in play or is already over
+SIZE = 3 ** 9
+MISSING = 0xFF
+NO_ACTION = 0x0F
+
+# The book `probe` answers from, read from FILENAME on first use; stays
+# None if there is no usable book
+table = None
+loaded = False
+
+
+def build():
+    """
+    Solves every position reachable from the empty board and returns
+    the book as bytes, without its header.
+    """
+    tictactoe.transpositions.clear()
+    seen = set()
+    frontier = [tictactoe.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key, _ = tictactoe.canonical(board)
+        if key in seen or tictactoe.terminal(board):
+            continue
+        seen.add(key)
+        if tictactoe.player(board) == tictactoe.X:
+            tictactoe.max_value(board, tictactoe.transpositions)
+        else:
+            tictactoe.min_value(board, tictactoe.transpositions)
+        for action in tictactoe.actions(board):
+            frontier.append(tictactoe.result(board, action))
+
+    book = bytearray([MISSING]) * SIZE
+    for key in seen:
+        value, index = tictactoe.transpositions[key]
+        book[key] = (value + 1) << 4 | (NO_ACTION if index is None else index)
+    return bytes(book)
+
+
+def save(book, filename=FILENAME):
+    """Writes `book` with its header to `filename`."""
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION))
+        f.write(book)
+
+
+def load(filename=FILENAME):
+    """
+    Returns the book stored in `filename`, or None if there is none or
+    it was written by an incompatible version.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if (len(data) != HEADER.size + SIZE
+            or HEADER.unpack_from(data) != (MAGIC, VERSION)):
+        return None
+    return data[HEADER.size:]
+
+
+def probe(board):
+    """
+    Returns the (value, action) of the board from the book, or None if
+    there is no book or the board is not in it.
+    """
+    global table, loaded
+    if not loaded:
+        table = load()
+        loaded = True
+    if table is None:
+        return None
+
+    key, symmetry = tictactoe.canonical(board)
+    entry = table[key]
+    if entry == MISSING:
+        return None
+    index = entry & 0x0F
+    return tictactoe.from_memo(
+        ((entry >> 4) - 1, None if index == NO_ACTION else index), symmetry
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve every reachable tic-tac-toe position "
+                    "and write the opening book."
+    )
+    parser.add_argument("--output", default=FILENAME)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    book = build()
+    save(book, args.output)
+    positions = SIZE - book.count(MISSING)
+    print(f"Solved {positions} canonical positions in "
+          f"{time.perf_counter() - start:.2f}s, wrote "
+          f"{HEADER.size + len(book)} bytes to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+m,n,k-game Player: k in a row on an m x n board
+"""
+
+import argparse
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Any score at least this large is a forced win rather than a heuristic
+WIN = 10 ** 9
+
+# Empty cells this close (in king moves) to a stone are worth searching
+RADIUS = 2
+
+# Check the clock once per this many positions searched
+CLOCK_INTERVAL = 1024
+
+
+class Timeout(Exception):
+    """Raised inside the search when a move's time budget runs out."""
+
+
+class MNKGame():
+    """
+    k-in-a-row on an m x n board, played on the same list-of-lists boards
+    as tictactoe.py, with an iterative-deepening alpha-beta player.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if not 1 <= k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every line of k cells a player could fill, with cells numbered
+        # n * i + j, and the lines through each cell
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(tuple(
+                            n * (i + di * step) + j + dj * step
+                            for step in range(k)
+                        ))
+        self.windows_of = [[] for _ in range(m * n)]
+        for window in self.windows:
+            for cell in window:
+                self.windows_of[cell].append(window)
+
+        self.nearby = [
+            [n * a + b
+             for a in range(max(0, i - RADIUS), min(m, i + RADIUS + 1))
+             for b in range(max(0, j - RADIUS), min(n, j + RADIUS + 1))]
+            for i in range(m) for j in range(n)
+        ]
+
+        # Heuristic scores are clamped to this, below every forced win,
+        # which scores at least WIN - m * n
+        self.horizon = WIN - m * n - 1
+
+        # Number of positions searched and deepest search completed by
+        # the last call to `best_move`
+        self.stats = {"nodes": 0, "depth": 0}
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return X if x_count == o_count else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        if action not in self.actions(board):
+            raise RuntimeError("Invalid Action!")
+        i, j = action
+        new_board = [row.copy() for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            first = cells[window[0]]
+            if first != EMPTY and all(cells[c] == first for c in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(EMPTY not in row for row in board))
+
+    def best_move(self, board, budget=1.0, max_depth=None):
+        """
+        Returns an action (i, j) for the current player on the board,
+        searching ever deeper with alpha-beta until `budget` seconds
+        have passed, `max_depth` plies are searched or the game is
+        solved. Returns None if the game is over.
+
+        Past the search horizon, positions are scored by counting the
+        lines each player could still complete, weighted by how many of
+        their stones those lines hold already.
+        """
+        if self.terminal(board):
+            return None
+
+        cells, color = self.flatten(board)
+        empty = cells.count(0)
+        if max_depth is None:
+            max_depth = empty
+
+        self.stats = {"nodes": 0, "depth": 0}
+        self.deadline = time.perf_counter() + budget
+        moves = self.candidates(cells, color)
+        best = moves[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self.root(cells, depth, color, moves, empty)
+            except Timeout:
+                break
+            best = move
+            self.stats["depth"] = depth
+            if abs(score) >= WIN - self.m * self.n:
+                break
+            # Search the previous best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+        return divmod(best, self.n)
+
+    def flatten(self, board):
+        """
+        Returns the board as a flat list with 1 for X, -1 for O and 0 for
+        empty cells, and the player to move as 1 or -1.
+        """
+        cells = [
+            0 if cell == EMPTY else 1 if cell == X else -1
+            for row in board for cell in row
+        ]
+        return cells, 1 if self.player(board) == X else -1
+
+    def root(self, cells, depth, color, moves, empty):
+        """
+        Searches every move in `moves` to `depth` plies, returning the best
+        score for `color` and the move that achieves it.
+        """
+        alpha = -WIN - 1
+        best = moves[0]
+        for move in moves:
+            cells[move] = color
+            try:
+                score = -self.negamax(cells, depth - 1, -WIN - 1, -alpha,
+                                      -color, move, empty - 1, 1)
+            finally:
+                cells[move] = 0
+            if score > alpha:
+                alpha = score
+                best = move
+        return alpha, best
+
+    def negamax(self, cells, depth, alpha, beta, color, last, empty, ply):
+        """
+        Returns the score of flat board `cells` for `color`, the player to
+        move, after `last` was just played. Wins found sooner score higher.
+        """
+        self.stats["nodes"] += 1
+        if (self.stats["nodes"] % CLOCK_INTERVAL == 0
+                and time.perf_counter() > self.deadline):
+            raise Timeout
+
+        if self.completes(cells, last):
+            return -(WIN - ply)
+        if empty == 0:
+            return 0
+        if depth == 0:
+            return color * self.evaluate(cells)
+
+        value = -WIN - 1
+        for move in self.candidates(cells, color, ordered=depth > 1):
+            cells[move] = color
+            score = -self.negamax(cells, depth - 1, -beta, -alpha,
+                                  -color, move, empty - 1, ply + 1)
+            cells[move] = 0
+            if score > value:
+                value = score
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+        return value
+
+    def completes(self, cells, cell):
+        """Returns True if the stone on `cell` is part of k in a row."""
+        stone = cells[cell]
+        for window in self.windows_of[cell]:
+            if all(cells[c] == stone for c in window):
+                return True
+        return False
+
+    def evaluate(self, cells):
+        """
+        Returns the heuristic score of flat board `cells` for X: every line
+        still open to just one player counts 10 ** (stones in it) for them,
+        up to a magnitude of `self.horizon`.
+        """
+        score = 0
+        for window in self.windows:
+            xs = os = 0
+            for c in window:
+                if cells[c] == 1:
+                    xs += 1
+                elif cells[c] == -1:
+                    os += 1
+            if not os:
+                if xs:
+                    score += 10 ** xs
+            elif not xs:
+                score -= 10 ** os
+        return max(-self.horizon, min(self.horizon, score))
+
+    def candidates(self, cells, color, ordered=True):
+        """
+        Returns the empty cells near a stone (or the center of an empty
+        board). If `ordered`, cells completing or blocking the longest
+        open lines come first.
+        """
+        if not any(cells):
+            return [self.n * (self.m // 2) + self.n // 2]
+        seen = set()
+        moves = []
+        for cell, stone in enumerate(cells):
+            if not stone:
+                continue
+            for near in self.nearby[cell]:
+                if not cells[near] and near not in seen:
+                    seen.add(near)
+                    moves.append(near)
+        if ordered:
+            moves.sort(key=lambda cell: -self.urgency(cells, cell, color))
+        return moves
+
+    def urgency(self, cells, cell, color):
+        """
+        Returns how much playing the empty `cell` matters: the lines
+        through it that only one player has stones in, weighted by how
+        many, with the player to move's own lines counting double.
+        """
+        total = 0
+        for window in self.windows_of[cell]:
+            mine = theirs = 0
+            for c in window:
+                if cells[c] == color:
+                    mine += 1
+                elif cells[c]:
+                    theirs += 1
+            if not theirs:
+                total += 2 * 10 ** mine
+            elif not mine:
+                total += 10 ** theirs
+        return total
+
+
+def show(board):
+    """Prints the board with row and column numbers."""
+    print("   " + " ".join(f"{j:>2}" for j in range(len(board[0]))))
+    for i, row in enumerate(board):
+        print(f"{i:>2} " + " ".join(f"{cell or '.':>2}" for cell in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play k in a row on an m x n board against the AI."
+    )
+    parser.add_argument("-m", "--rows", type=int, default=7)
+    parser.add_argument("-n", "--columns", type=int, default=7)
+    parser.add_argument("-k", "--length", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds the AI may think per move")
+    parser.add_argument("--play", choices=[X, O],
+                        help="play as this side; by default the AI "
+                             "plays itself")
+    args = parser.parse_args()
+
+    game = MNKGame(args.rows, args.columns, args.length)
+    board = game.initial_state()
+    while not game.terminal(board):
+        show(board)
+        if game.player(board) == args.play:
+            try:
+                i, j = (int(x) for x in input("Your move (row col): ").split())
+                board = game.result(board, (i, j))
+            except (ValueError, RuntimeError):
+                print("Invalid move.")
+            continue
+        start = time.perf_counter()
+        action = game.best_move(board, args.budget)
+        print(f"AI plays {action} (depth {game.stats['depth']}, "
+              f"{game.stats['nodes']} nodes, "
+              f"{time.perf_counter() - start:.2f}s)")
+        board = game.result(board, action)
+
+    show(board)
+    winner = game.winner(board)
+    print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+    main()
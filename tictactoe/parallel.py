@@ -0,0 +1,151 @@
+"""
+Root-parallel search for m,n,k-games: each root move is searched in its
+own worker process, with the best score so far shared as a bound
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+
+from mnk import MNKGame, WIN
+
+# Root moves are ranked by score * SLOTS + (SLOTS - 1 - index) so one
+# integer orders them by score and then by their position in move order
+SLOTS = 1 << 16
+# Key of the best root move before any has been searched exactly
+NO_MOVE = -(WIN + 2) * SLOTS
+
+# The game and the best root key found so far, as seen by each worker
+# process, set by `attach`
+worker_game = None
+worker_best = None
+
+
+def attach(m, n, k, best):
+    """
+    Pool initializer giving this worker its own game and
+    the shared best root key.
+    """
+    global worker_game, worker_best
+    worker_game = MNKGame(m, n, k)
+    worker_game.deadline = math.inf
+    worker_best = best
+
+
+def search_root_move(task):
+    """
+    Searches one root move and returns (index, score, exact, nodes), where
+    `exact` is False if the move was proven no better than the best root
+    move already known and `score` is then only an upper bound.
+    """
+    cells, depth, color, move, index, empty = task
+    with worker_best.get_lock():
+        key = worker_best.value
+    if key == NO_MOVE:
+        alpha = -WIN - 1
+    else:
+        best_score, slot = divmod(key, SLOTS)
+        best_index = SLOTS - 1 - slot
+        # An earlier move in order wins ties, so it must beat the best
+        # score minus one; a later one must beat it outright
+        alpha = best_score - 1 if index < best_index else best_score
+
+    worker_game.stats = {"nodes": 0, "depth": depth}
+    cells = list(cells)
+    cells[move] = color
+    score = -worker_game.negamax(cells, depth - 1, -WIN - 1, -alpha,
+                                 -color, move, empty - 1, 1)
+    exact = score > alpha
+    if exact:
+        with worker_best.get_lock():
+            worker_best.value = max(worker_best.value,
+                                    score * SLOTS + SLOTS - 1 - index)
+    return index, score, exact, worker_game.stats["nodes"]
+
+
+def best_move(game, board, depth, pool, best):
+    """
+    Returns (action, score, nodes) for the current player on the board,
+    searching every root move `depth` plies deep across the worker `pool`
+    created with `attach` and the shared key `best`.
+
+    The action is the first move, in the game's own move order, with the
+    highest score, so it does not depend on which worker finishes first.
+    """
+    if game.terminal(board):
+        return None, None, 0
+
+    cells, color = game.flatten(board)
+    empty = cells.count(0)
+    moves = game.candidates(cells, color)
+
+    with best.get_lock():
+        best.value = NO_MOVE
+    tasks = [(cells, min(depth, empty), color, move, index, empty)
+             for index, move in enumerate(moves)]
+
+    winner = None
+    nodes = 0
+    for index, score, exact, searched in pool.imap_unordered(
+            search_root_move, tasks):
+        nodes += searched
+        if exact and (winner is None or (score, -index) > winner):
+            winner = (score, -index)
+    score, index = winner
+    return divmod(moves[-index], game.n), score, nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how root-parallel m,n,k search scales "
+                    "with the number of worker processes."
+    )
+    parser.add_argument("-m", "--rows", type=int, default=7)
+    parser.add_argument("-n", "--columns", type=int, default=7)
+    parser.add_argument("-k", "--length", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="largest number of worker processes to try")
+    args = parser.parse_args()
+
+    game = MNKGame(args.rows, args.columns, args.length)
+    # An early middle-game position so the root has plenty of moves
+    board = game.initial_state()
+    center = (args.rows // 2, args.columns // 2)
+    for di, dj in [(0, 0), (0, 1), (1, 1), (-1, 0)]:
+        action = (center[0] + di, center[1] + dj)
+        if action in game.actions(board):
+            board = game.result(board, action)
+
+    start = time.perf_counter()
+    game.deadline = math.inf
+    game.stats = {"nodes": 0, "depth": args.depth}
+    cells, color = game.flatten(board)
+    serial_score, serial_move = game.root(
+        cells, args.depth, color, game.candidates(cells, color),
+        cells.count(0)
+    )
+    serial = time.perf_counter() - start
+    print(f"{'workers':<10}{'action':>10}{'score':>12}{'nodes':>10}"
+          f"{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':<10}{str(divmod(serial_move, game.n)):>10}"
+          f"{serial_score:>12}{game.stats['nodes']:>10}{serial:>10.2f}"
+          f"{1:>10.2f}")
+
+    for workers in range(1, args.workers + 1):
+        best = multiprocessing.Value("q")
+        with multiprocessing.Pool(
+                workers, attach,
+                (args.rows, args.columns, args.length, best)) as pool:
+            start = time.perf_counter()
+            action, score, nodes = best_move(game, board, args.depth,
+                                             pool, best)
+            elapsed = time.perf_counter() - start
+        print(f"{workers:<10}{str(action):>10}{score:>12}{nodes:>10}"
+              f"{elapsed:>10.2f}{serial / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,41 @@
 Tic Tac Toe Player
 """
 
-import copy
 import math
 
+import bitboard
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, each as a permutation
+# where cell k of the transformed board is cell SYMMETRIES[s][k] of the
+# original, with cells numbered 3 * i + j
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror columns
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror rows
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # transpose
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # anti-transpose
+]
+
+# Maps canonical board keys to (value, canonical action index), shared by
+# every call to `minimax` in this process
+transpositions = dict()
+
+# Order in which the alpha-beta engine tries moves before its killer and
+# history heuristics have learned anything: center, corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Number of positions searched, and of alpha-beta cutoffs made
+search_stats = {"nodes": 0, "cutoffs": 0}
+
 
 def initial_state():
     """
@@ -60,7 +88,7 @@ def result(board, action):
         raise RuntimeError("Invalid Action!")
 
     curr_player = player(board)
-    new_board = copy.deepcopy(board)
+    new_board = [row.copy() for row in board]
     i, j = action
 
     new_board[i][j] = curr_player
@@ -147,24 +175,77 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def canonical(board):
+    """
+    Returns (key, symmetry) where `key` identifies the board up to
+    rotation and reflection, and SYMMETRIES[symmetry] transforms the
+    board into the orientation `key` describes.
+    """
+    cells = [
+        0 if cell == EMPTY else 1 if cell == X else 2
+        for row in board for cell in row
+    ]
+    key = None
+    for symmetry, permutation in enumerate(SYMMETRIES):
+        transformed = 0
+        for k in permutation:
+            transformed = transformed * 3 + cells[k]
+        if key is None or transformed < key:
+            key = transformed
+            best = symmetry
+    return key, best
+
+
+def minimax(board, engine="book"):
     """
     Returns the optimal action for the current player on the board.
+
+    `engine` picks the search: "plain" explores the full game tree,
+    "memo" reuses the value of every position seen before, in any
+    rotation or reflection, from the process-wide transposition table,
+    "alphabeta" prunes moves that cannot change the result, and
+    "bitboard" runs the same pruned search on the two-mask board of
+    bitboard.py, and "book" looks the board up in the opening book
+    written by book.py, searching like "memo" if there is no book.
     """
 
     if terminal(board):
         return None
-    
+
+    if engine == "book":
+        entry = book.probe(board)
+        if entry is not None:
+            return entry[1]
+        engine = "memo"
+
+    if engine == "alphabeta":
+        ordering = {"killers": {}, "history": {}}
+        if player(board) == X:
+            _, action = ab_max_value(board, -math.inf, math.inf, ordering)
+        else:
+            _, action = ab_min_value(board, -math.inf, math.inf, ordering)
+        return action
+
+    if engine == "bitboard":
+        return bitboard.minimax(board)
+
+    memo = transpositions if engine == "memo" else None
     curr_player = player(board)
     if curr_player == X:
-        _, action = max_value(board)
+        _, action = max_value(board, memo)
         return action
     else:
-        _, action = min_value(board)
+        _, action = min_value(board, memo)
         return action
 
 
-def max_value(board):
+def max_value(board, memo=None):
+    if memo is not None:
+        key, symmetry = canonical(board)
+        if key in memo:
+            return from_memo(memo[key], symmetry)
+
+    search_stats["nodes"] += 1
     value = float('-inf')
     opt_action = None
 
@@ -174,14 +255,23 @@ def max_value(board):
     possible_actions = actions(board)
     for action in possible_actions:
         # print(f"attempting action: {action} in MAX FUNCTION")
-        v, _ = min_value(result(board, action))
+        v, _ = min_value(result(board, action), memo)
         if v >= value:
             value = v
             opt_action = action
+
+    if memo is not None:
+        memo[key] = to_memo(value, opt_action, symmetry)
     return (value, opt_action)
 
 
-def min_value(board):
+def min_value(board, memo=None):
+    if memo is not None:
+        key, symmetry = canonical(board)
+        if key in memo:
+            return from_memo(memo[key], symmetry)
+
+    search_stats["nodes"] += 1
     value = float('inf')
     opt_action = None
 
@@ -191,8 +281,108 @@ def min_value(board):
     possible_actions = actions(board)
     for action in possible_actions:
         # print(f"attempting action: {action} in MIN FUNCTION")
-        v, _ = max_value(result(board, action))
+        v, _ = max_value(result(board, action), memo)
         if v < value:
             value = v
             opt_action = action
-    return (value, opt_action)
\ No newline at end of file
+
+    if memo is not None:
+        memo[key] = to_memo(value, opt_action, symmetry)
+    return (value, opt_action)
+
+
+def ordered_actions(board, ordering):
+    """
+    Returns the actions available on the board, trying first the killer
+    move that last caused a cutoff at this depth, then moves by how many
+    cutoffs they have caused, then by MOVE_ORDER.
+    """
+    depth = len(actions(board))
+    killer = ordering["killers"].get(depth)
+    history = ordering["history"]
+    return sorted(actions(board), key=lambda action: (
+        action != killer,
+        -history.get(action, 0),
+        MOVE_ORDER.index(action),
+    ))
+
+
+def record_cutoff(board, action, ordering):
+    """
+    Remembers that `action` caused a cutoff on the board, weighting
+    cutoffs higher up the tree more heavily.
+    """
+    depth = len(actions(board))
+    search_stats["cutoffs"] += 1
+    ordering["killers"][depth] = action
+    history = ordering["history"]
+    history[action] = history.get(action, 0) + depth ** 2
+
+
+def ab_max_value(board, alpha, beta, ordering):
+    """
+    Returns (value, action) for X on the board, searching only moves
+    whose value could fall strictly between `alpha` and `beta`.
+    """
+    search_stats["nodes"] += 1
+    if terminal(board):
+        return (utility(board), None)
+
+    value = -math.inf
+    opt_action = None
+    for action in ordered_actions(board, ordering):
+        v, _ = ab_min_value(result(board, action), alpha, beta, ordering)
+        if v > value:
+            value = v
+            opt_action = action
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            record_cutoff(board, action, ordering)
+            break
+    return (value, opt_action)
+
+
+def ab_min_value(board, alpha, beta, ordering):
+    """
+    Returns (value, action) for O on the board, searching only moves
+    whose value could fall strictly between `alpha` and `beta`.
+    """
+    search_stats["nodes"] += 1
+    if terminal(board):
+        return (utility(board), None)
+
+    value = math.inf
+    opt_action = None
+    for action in ordered_actions(board, ordering):
+        v, _ = ab_max_value(result(board, action), alpha, beta, ordering)
+        if v < value:
+            value = v
+            opt_action = action
+        beta = min(beta, value)
+        if alpha >= beta:
+            record_cutoff(board, action, ordering)
+            break
+    return (value, opt_action)
+
+
+def to_memo(value, action, symmetry):
+    """
+    Returns the transposition table entry for a board whose best action
+    is `action`, with the action moved into canonical orientation.
+    """
+    if action is None:
+        return (value, None)
+    i, j = action
+    return (value, SYMMETRIES[symmetry].index(3 * i + j))
+
+
+def from_memo(entry, symmetry):
+    """
+    Returns the (value, action) stored in a transposition table entry,
+    with the action moved back into the board's own orientation.
+    """
+    value, index = entry
+    if index is None:
+        return (value, None)
+    cell = SYMMETRIES[symmetry][index]
+    return (value, (cell // 3, cell % 3))